@@ -13,6 +13,11 @@ import numpy as np
 import matplotlib.pyplot as plt
 import urllib 
 import pandas as pd 
+import os
+import sys
+# The propagation products reader lives next to the canonical pipeline
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Orbit Propagation (Aiden-Dawn)"))
+from products import open_products
 
 
 from scipy.stats import norm
@@ -45,17 +50,17 @@ pixel     = 0.0002777777778     # [deg] Coordinate increment at reference point.
 # SPACECRAFT DATA 
 #--------------------------------------------------------------------------------------------------------------------
 
-data = np.genfromtxt('satcoord.csv',delimiter=',',skip_header=1) # inputs data file
+sat = open_products() # memory-maps the products/ columns from the orbit propagation and flux_counts.py
 
-TimeEST = data[:,0]
-RA      = data[:,1]
-Dec     = data[:,2]
-Az      = data[:,3]
-Alt     = data[:,4]
-Dist    = data[:,5]
-R_Flux  = data[:,6]
-# Count   = data[:,7]
-# AirMass = data[:,8]
+TimeEST = sat.time      # UTC
+RA      = sat.ra
+Dec     = sat.dec
+Az      = sat.az
+Alt     = sat.alt
+Dist    = sat.distance
+R_Flux  = sat.columns['flux']
+# Count   = sat.columns['counts']
+# AirMass = sat.columns['airmass']
 
 
 def find_middle(lst):
@@ -73,8 +78,8 @@ def find_middle(lst):
 RA_import = find_middle(RA)
 Dec_import = find_middle(Dec)
 
-print("The length of the imported CSV File is {}".format(len(data)))
-print("If the CSV file is over 10,000 lines you may encounter long wait times \n")
+print("The number of imported samples is {}".format(sat.size))
+print("If there are over 10,000 samples you may encounter long wait times \n")
 
 print ("SPACECRAFT DATA IMPORTED")
 
@@ -399,7 +404,7 @@ def Landoltplot(image,figsize=(15,15),cmap='inferno',scale=0.5,colorbar=False,he
             fc='green', ec='green', width=0.0003, 
             transform=ax.get_transform('icrs')) 
     
-    for i in range(0,len(data)):
+    for i in range(0,sat.size):
         if R_Flux[i] != 0:
             ax.plot(RA[i],Dec[i], marker=".", transform=ax.get_transform('icrs'))
 
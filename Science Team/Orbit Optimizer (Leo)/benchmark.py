@@ -0,0 +1,280 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import numpy as np
+import TLEconstructor   # also puts the shared propagation folder on sys.path
+import telemetry
+from settings import Settings, parameters
+from resources import EPHEMERIS
+from propagation import grid_shape
+from grid_sweep import score_orbit
+from score import orbit_score
+from optimize_orbit import optimize_orbit
+
+# Windows (days) and steps (ms) of the standard benchmark grid
+WINDOWS = (1, 30, 365)
+TDELTAS = (60_000, 300_000, 900_000)
+START = datetime(2029, 1, 1)
+# Fixed GEO circular orbit and observer, whatever settings.json holds
+GEO = dict(epoch=28856,  # 2029-01-01
+           bstar=0, ndot=0, nddot=0, ecco=0, argpo=0, inclo=0, mo=0, nodeo=0,
+           no_kozai=0.00437519126, timezone='US/Eastern',
+           lat=19.82, lon=-155.4694, elev=4245, tle1='NA', tle2='NA')
+# Scoring options of the score_orbit stage (optimize_orbit's defaults)
+SCORING = dict(alt_threshold=90 - np.degrees(np.arccos(1/1.6)),
+               night_limits={"Rubin": 2, "Mason": 2, "Palomar": 2, "SNIFS": 2},
+               weights={"Rubin": 0.25, "Mason": 0.25, "Palomar": 0.25, "SNIFS": 0.25},
+               weight_per_night=20)
+# Latency ratio to the baseline reported as a regression...
+TOLERANCE = 1.25
+# ...when also at least this much slower, so timer noise on tiny stages is ignored
+MIN_SLOWDOWN_MS = 0.1
+FORMAT_VERSION = 1
+
+
+@contextlib.contextmanager
+def scenario(days, tdelta):
+    """
+    Point the shared ``parameters`` (and so func(), orbit_score() and
+    optimize_orbit()) at the GEO orbit over ``days`` from START, sampled
+    every ``tdelta`` ms, one chunk per day.  Restored on exit.
+    """
+    end = START + timedelta(days=days)
+    config = Settings(**GEO, start=f"{START:%Y-%m-%d %H:%M:%S}", end=f"{end:%Y-%m-%d %H:%M:%S}",
+                      tdelta=tdelta, chunks=86_400_000 // tdelta).as_dict()
+    saved = parameters.as_dict()
+    for name, value in config.items():
+        setattr(parameters, name, value)
+    try:
+        yield parameters
+    finally:
+        for name, value in saved.items():
+            setattr(parameters, name, value)
+
+
+@contextlib.contextmanager
+def scratch_directory(ephemeris=EPHEMERIS):
+    """
+    Run inside an empty temporary working directory holding only a link to
+    ``ephemeris``, so every cache (orbits, twilight, Sun/Earth, frames)
+    starts cold and the user's caches are left alone.
+    """
+    source = os.path.abspath(ephemeris)
+    if not os.path.exists(source):
+        raise FileNotFoundError(f"{source} is needed to run the benchmarks")
+    here = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='orbit-benchmark-') as folder:
+        os.symlink(source, os.path.join(folder, os.path.basename(ephemeris)))
+        os.chdir(folder)
+        try:
+            yield folder
+        finally:
+            os.chdir(here)
+
+
+def _measure(call, args):
+    """
+    Best seconds per call of ``call`` and its peak traced memory (MB).
+
+    The first argument tuple runs under tracemalloc for the peak only; the
+    others are timed without it, after telemetry.reset(), so the stage
+    totals afterwards belong to the timed calls alone.  The fastest call is
+    kept, as timeit does: slower ones measure other load on the machine.
+    """
+    tracemalloc.start()
+    try:
+        call(*args[0])
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    telemetry.reset()
+    seconds = []
+    for arg in args[1:]:
+        start = time.perf_counter()
+        call(*arg)
+        seconds.append(time.perf_counter() - start)
+    return min(seconds), peak / 2**20
+
+
+def _quiet(call):
+    # optimize_orbit prints its progress; keep the report readable
+    def run(*args, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return call(*args, **kwargs)
+    return run
+
+
+def run_scenario(days, tdelta, repeats=5, optimize_res=3):
+    """
+    Benchmark one window / step of the GEO scenario.
+
+    Stages, each as milliseconds per orbit, samples per second and (where
+    measured) peak traced memory:
+
+    * ``func (first orbit)``: first TLEconstructor.func() on the grid,
+      including its twilight, Sun/Earth and frame tables
+    * ``func``: func() of a new orbit (propagation, orbit cache write,
+      DataFrame), then ``func: <stage>`` for its telemetry stages (sgp4,
+      frames, eclipse, ...)
+    * ``func (cached)``: func() of an orbit already in the orbit cache
+    * ``score_orbit``: grid_sweep.score_orbit() of one func() table
+    * ``orbit_score``: score.orbit_score() of a cached orbit
+    * ``optimize_orbit``: a serial ``optimize_res`` x ``optimize_res`` grid
+      search from an empty orbit cache, per evaluated orbit
+
+    Latencies are the best of ``repeats`` calls, on distinct orbits where
+    the orbit cache would otherwise answer; telemetry stages are averaged
+    over the same calls.
+    """
+    with scenario(days, tdelta) as config:
+        num_chunks, chunk_len = grid_shape(config)
+        samples = num_chunks * chunk_len
+        stages = {}
+
+        def record(name, seconds, peak=None, orbits=1):
+            stages[name] = dict(ms_per_orbit=seconds / orbits * 1e3,
+                                samples_per_second=samples * orbits / seconds if seconds else None,
+                                peak_mb=peak)
+
+        # Distinct RAANs, so every func() below is an orbit cache miss
+        raans = iter(np.radians(np.arange(1, 10_000) * 7.3) % (2*np.pi))
+
+        start = time.perf_counter()
+        df = TLEconstructor.func(0, 0, next(raans))
+        record('func (first orbit)', time.perf_counter() - start)
+
+        fresh = [(0, 0, next(raans)) for _ in range(repeats + 1)]
+        seconds, peak = _measure(TLEconstructor.func, fresh)
+        record('func', seconds, peak)
+        for name, (total, calls) in telemetry.snapshot().items():
+            record(f'func: {name}', total / repeats)
+
+        cached = fresh[-1:] * (repeats + 1)
+        record('func (cached)', *_measure(TLEconstructor.func, cached))
+        record('score_orbit', *_measure(lambda: score_orbit(df, **SCORING), [()] * (repeats + 1)))
+        record('orbit_score', *_measure(lambda raan: orbit_score(raan, 0), [(cached[0][2],)] * (repeats + 1)))
+
+        def optimize():
+            # From an empty orbit cache each time; the per-grid tables stay warm
+            shutil.rmtree(os.path.join('cache', 'orbits'), ignore_errors=True)
+            _quiet(optimize_orbit)(res=optimize_res, progress=False)
+        seconds, peak = _measure(optimize, [()] * 2)
+        record('optimize_orbit', seconds, peak, orbits=optimize_res**2)
+
+    return dict(days=days, tdelta=tdelta, samples=samples, stages=stages)
+
+
+def run(windows=WINDOWS, tdeltas=TDELTAS, repeats=5, optimize_res=3, report=print):
+    """
+    Benchmark every (window, tdelta) pair in a scratch directory; returns
+    the results in the format save() writes.  ``report`` is called with
+    each finished scenario's lines.
+    """
+    results = dict(format=FORMAT_VERSION, created=datetime.now().isoformat(timespec='seconds'),
+                   machine=platform.platform(), processor=platform.processor(),
+                   python=platform.python_version(), numpy=np.__version__,
+                   repeats=repeats, optimize_res=optimize_res, scenarios=[])
+    with scratch_directory():
+        for days in windows:
+            for tdelta in tdeltas:
+                result = run_scenario(days, tdelta, repeats, optimize_res)
+                results['scenarios'].append(result)
+                if report:
+                    report(format_scenario(result))
+    return results
+
+
+def format_scenario(result):
+    """Printable table of one run_scenario() result."""
+    lines = [f"{result['days']} d window, tdelta {result['tdelta'] / 1000:g} s, {result['samples']} samples"]
+    for name, stage in result['stages'].items():
+        rate = stage['samples_per_second']
+        peak = stage['peak_mb']
+        lines.append(f"  {name:22s} {stage['ms_per_orbit']:11.2f} ms/orbit"
+                     f"  {rate if rate is not None else float('nan'):14,.0f} samples/s"
+                     + (f"  {peak:9.1f} MB peak" if peak is not None else ''))
+    return '\n'.join(lines)
+
+
+def save(results, path):
+    """Write run() results as a JSON baseline."""
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    with open(path, 'w') as file:
+        json.dump(results, file, indent=4)
+
+
+def load(path):
+    """Baseline written by save()."""
+    with open(path) as file:
+        results = json.load(file)
+    if results.get('format') != FORMAT_VERSION:
+        raise ValueError(f"{path} is benchmark format {results.get('format')}, expected {FORMAT_VERSION}")
+    return results
+
+
+def compare(results, baseline, tolerance=TOLERANCE, min_slowdown_ms=MIN_SLOWDOWN_MS):
+    """
+    Per-orbit latency of ``results`` against ``baseline`` for every stage
+    both measured.  Returns (days, tdelta, stage, baseline ms, ms, ratio)
+    rows and the regressions among them: slower than ``tolerance`` times
+    the baseline and by at least ``min_slowdown_ms``.
+    """
+    before = {(s['days'], s['tdelta']): s['stages'] for s in baseline['scenarios']}
+    rows = []
+    for scenario_result in results['scenarios']:
+        key = (scenario_result['days'], scenario_result['tdelta'])
+        for name, stage in scenario_result['stages'].items():
+            old = before.get(key, {}).get(name)
+            if old and old['ms_per_orbit']:
+                rows.append(key + (name, old['ms_per_orbit'], stage['ms_per_orbit'],
+                                   stage['ms_per_orbit'] / old['ms_per_orbit']))
+    return rows, [row for row in rows if row[-1] > tolerance and row[4] - row[3] >= min_slowdown_ms]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the orbit propagation and scoring pipeline "
+                                                 "on a fixed GEO circular orbit.")
+    parser.add_argument('--windows', type=int, nargs='+', default=WINDOWS, help="window lengths in days")
+    parser.add_argument('--tdelta', type=int, nargs='+', default=TDELTAS, help="sample steps in ms")
+    parser.add_argument('--repeats', type=int, default=5, help="timed calls per stage")
+    parser.add_argument('--optimize-res', type=int, default=3, help="optimize_orbit grid size (res x res)")
+    parser.add_argument('--save', help="write the results to this JSON baseline")
+    parser.add_argument('--baseline', help="compare against this saved baseline")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help="latency ratio counted as a regression")
+    args = parser.parse_args(argv)
+
+    # Resolve before run() moves into its scratch directory
+    save_path = args.save and os.path.abspath(args.save)
+    baseline = load(args.baseline) if args.baseline else None
+
+    results = run(args.windows, args.tdelta, args.repeats, args.optimize_res)
+    if save_path:
+        save(results, save_path)
+        print(f"Saved {save_path}")
+    if baseline is None:
+        return 0
+
+    rows, regressions = compare(results, baseline, args.tolerance)
+    print(f"\nAgainst {args.baseline} ({baseline['created']}, {baseline['machine']}):")
+    for row in rows:
+        days, tdelta, name, old, new, ratio = row
+        flag = '  REGRESSION' if row in regressions else ''
+        print(f"  {days:4d} d {tdelta / 1000:5g} s  {name:22s} {old:11.2f} -> {new:11.2f} ms/orbit  x{ratio:5.2f}{flag}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,304 @@
+import os
+import numpy as np
+from functools import partial
+from multiprocessing import Pool
+import TLEconstructor   # must provide func(inc, eccen, raan)
+from eclipse import in_shadow
+from batch_propagation import propagate_batch
+from resources import preload
+from score_kernel import day_index, visibility_counts
+from telemetry import stage, snapshot, since, merge
+
+# Site labels this folder's TLEconstructor.func() uses
+SITE_NAMES = TLEconstructor.SITE_NAMES
+
+# Scoring options of the running sweep, set once per worker process
+_job = {}
+
+
+def score_orbit(df, alt_threshold, night_limits, weights, weight_per_night):
+    """
+    Weighted visibility quality of one func() table.
+
+    ``night_limits`` and ``weights`` are keyed by telescope name.  Returns a
+    dict with 'weighted_vis', 'avg_nights', 'vis_pct', 'eclipse_nights' and
+    'quality' (weighted visibility plus ``weight_per_night`` per average
+    eclipse night).  All telescopes are counted in one pass (see
+    score_kernel.py).
+    """
+    telescopes = list(weights)
+    alt = np.stack([df[f"{tel} Alt (Deg)"].to_numpy() for tel in telescopes])
+    # rows with telescope night ≤ night_limit
+    night = np.stack([df[f"{tel} TIME"].to_numpy() < night_limits[tel] for tel in telescopes])
+    if "Time (EST)" in df.columns:
+        day = day_index(df["Time (EST)"])
+        shadow = in_shadow(df["Eclipse (Frac)"].to_numpy())
+    else:
+        day = shadow = None
+    total, visible, eclipsed = visibility_counts(alt, night, shadow, day, alt_threshold)
+
+    vis_pct = {}
+    nights = {}
+    for k, tel in enumerate(telescopes):
+        vis_pct[tel] = (visible[k] / total[k] * 100) if total[k] else 0
+        nights[tel] = int(eclipsed[k])
+
+    # weighted mean visibility
+    weighted_vis = sum(weights[t] * vis_pct[t] for t in weights)
+    avg_nights = np.mean([nights[t] for t in weights])
+
+    return dict(
+        weighted_vis=weighted_vis,
+        avg_nights=avg_nights,
+        vis_pct=vis_pct,
+        eclipse_nights=nights,
+        quality=weighted_vis + weight_per_night * avg_nights
+    )
+
+
+def _init_worker(job):
+    _job.clear()
+    _job.update(job)
+    # Timescale and de421 once per process, not once per propagated cell
+    preload()
+
+
+def score_cell(cell, df):
+    """Score one propagated cell with the sweep's score_orbit() options."""
+    index, raan, inc = cell[:3]
+    with stage('scoring'):
+        return index, raan, inc, score_orbit(df, **_job)
+
+
+def cell_tables(cell, df):
+    """Compact per-orbit arrays (altitudes, shadow mask) for rescore.propagate_grid()."""
+    index, raan, inc = cell[:3]
+    alt = np.stack([df[f"{tel} Alt (Deg)"].to_numpy() for tel in _job["telescopes"]])
+    return index, raan, inc, (alt, in_shadow(df["Eclipse (Frac)"].to_numpy()))
+
+
+def _elements(cell):
+    # func() arguments of a cell; the optional fourth item holds eccen / no_kozai / argpo / mo
+    extra = dict(cell[3]) if len(cell) > 3 else {}
+    return (cell[2], extra.pop("eccen", 0), cell[1]), extra
+
+
+def _run(unit, task, batch):
+    # One cell through func(), or a list of cells through one SatrecArray
+    if not batch:
+        args, extra = _elements(unit)
+        return [task(unit, TLEconstructor.func(*args, **extra))]
+    elements = []
+    for cell in unit:
+        args, extra = _elements(cell)
+        elements.append(args + (extra.get("no_kozai"), extra.get("argpo"), extra.get("mo")))
+    results = propagate_batch(elements, len(unit), names=SITE_NAMES)
+    done = []
+    for cell, result in zip(unit, results):
+        with stage('dataframe'):
+            df = result.obs_frame()
+        done.append(task(cell, df))
+    return done
+
+
+def _run_timed(unit, task, batch):
+    # Pool workers send their stage timings back with the results
+    before = snapshot()
+    results = _run(unit, task, batch)
+    return results, since(before)
+
+
+def sweep(cells, job, workers=1, chunksize=None, task=score_cell, batch=None):
+    """
+    Score (RAAN, inclination) cells, yielding results as they finish.
+
+    ``cells`` is a list of (index, raan, inc) tuples, optionally with a
+    fourth item, a dict of further func() elements (``eccen``, ``no_kozai``,
+    ``argpo``, ``mo``; unset ones come from settings.json, eccentricity 0),
+    and ``job`` the keyword arguments of score_orbit() other than ``df``.  Yields
+    (index, raan, inc, score) tuples, where ``task`` (another module-level
+    function of a cell and its func() table) can replace the scorer; with
+    ``workers`` > 1 (or None for every core) they arrive in completion
+    order, not grid order.
+
+    With ``batch`` set, cells are propagated ``batch`` at a time through
+    batch_propagation.propagate_batch() (one SGP4 SatrecArray call per
+    chunk) instead of one func() call each; the orbit cache is not used.
+
+    The first cell (or batch) is always evaluated in this process.  That
+    builds the twilight and Sun/Earth tables for the settings.json time
+    grid and loads the timescale and de421 (resources.preload()), so the
+    pool workers inherit them and memory-map the same cache files instead
+    of each recomputing them.
+
+    Stage timings (see telemetry.py) of pool workers are merged into this
+    process as their results arrive, so telemetry.profile() covers the
+    whole sweep.
+    """
+    cells = list(cells)
+    if not cells:
+        return
+    units = [cells[lo:lo + batch] for lo in range(0, len(cells), batch)] if batch else cells
+    run = partial(_run, task=task, batch=batch)
+
+    _init_worker(job)
+    yield from run(units[0])
+    if workers == 1:
+        for unit in units[1:]:
+            yield from run(unit)
+        return
+
+    workers = workers or os.cpu_count()
+    if chunksize is None:
+        # A few chunks per worker keeps the pool balanced without much IPC
+        chunksize = max(1, len(units) // (workers * 4))
+    timed = partial(_run_timed, task=task, batch=batch)
+    with Pool(workers, initializer=_init_worker, initargs=(job,)) as pool:
+        for results, stages in pool.imap_unordered(timed, units[1:], chunksize):
+            merge(stages)
+            yield from results
+
+
+def coarse_to_fine(job, raan_range, incl_range, res, budget, top_k=4,
+                   resolution=np.radians(0.5), workers=1, batch=None):
+    """
+    Budgeted alternative to scoring a full grid.
+
+    ``job`` is the same score_orbit() keyword dict sweep() takes.
+
+    Scores a coarse ``res`` x ``res`` grid over ``raan_range`` and
+    ``incl_range`` (radians, inclination signed), then repeatedly halves the
+    step and scores the eight neighbours of the ``top_k`` best points found
+    so far.  Once the step reaches ``resolution`` it keeps hill-climbing at
+    that step until no new neighbours are left or ``budget`` evaluations
+    have been spent.
+
+    ``workers`` and ``batch`` are passed to sweep() for each level.  Yields
+    (index, raan, inc, score) like sweep(), with ``index`` the
+    evaluation order and ``inc`` wrapped to [0, 2π) as func() expects.
+    """
+    if res * res > budget:
+        raise ValueError(f"Coarse grid needs {res * res} evaluations, budget is {budget}")
+
+    raan_lo, raan_hi = raan_range
+    incl_lo, incl_hi = incl_range
+    raan_step = (raan_hi - raan_lo) / (res - 1)
+    incl_step = (incl_hi - incl_lo) / (res - 1)
+    # (raan, signed inc) -> (quality, index)
+    seen = {}
+
+    def evaluate(points):
+        fresh = []
+        for raan, inc in points:
+            point = (round(float(np.clip(raan, raan_lo, raan_hi)), 12),
+                     round(float(np.clip(inc, incl_lo, incl_hi)), 12))
+            if point not in seen and point not in fresh:
+                fresh.append(point)
+        fresh = fresh[:budget - len(seen)]
+        cells = [(len(seen) + k, raan, inc % (2*np.pi)) for k, (raan, inc) in enumerate(fresh)]
+        for point, (index, raan, inc) in zip(fresh, cells):
+            seen[point] = (-np.inf, index)
+        for index, raan, inc, score in sweep(cells, job, workers, batch=batch):
+            seen[fresh[index - cells[0][0]]] = (score["quality"], index)
+            yield index, raan, inc, score
+
+    yield from evaluate([(r, i) for r in np.linspace(raan_lo, raan_hi, res)
+                         for i in np.linspace(incl_lo, incl_hi, res)])
+
+    while len(seen) < budget:
+        at_resolution = raan_step <= resolution and incl_step <= resolution
+        raan_step = max(raan_step / 2, resolution)
+        incl_step = max(incl_step / 2, resolution)
+
+        # ties go to the earliest evaluation
+        centers = sorted(seen, key=lambda p: (-seen[p][0], seen[p][1]))[:top_k]
+        before = len(seen)
+        yield from evaluate([(r + dr*raan_step, i + di*incl_step) for r, i in centers
+                             for dr in (-1, 0, 1) for di in (-1, 0, 1) if dr or di])
+        if at_resolution and len(seen) == before:
+            break
+
+
+# Orbital elements sample_search() can vary, in sampling order
+ELEMENTS = ("raan", "inc", "eccen", "argpo", "no_kozai", "mo")
+# Default rounding step per element (radians, eccentricity, radians/minute)
+RESOLUTION = dict(raan=np.radians(0.25), inc=np.radians(0.25), eccen=1e-3,
+                  argpo=np.radians(1), no_kozai=1e-6, mo=np.radians(1))
+
+
+def sample_search(job, bounds, budget, population=None, elite=0.2, resolution=None,
+                  seed=0, workers=1, batch=None):
+    """
+    Budgeted sampling search over up to six orbital elements.
+
+    ``job`` is the score_orbit() keyword dict sweep() takes and ``bounds``
+    maps element names from ELEMENTS to (low, high) ranges (radians,
+    inclination signed; ``no_kozai`` in radians/minute).  ``raan`` and
+    ``inc`` are required; other elements left out come from settings.json
+    (eccentricity 0), and equal bounds fix an element.
+
+    A Latin hypercube of ``population`` points (default budget // 8, at
+    least 10) is scored first.  Each following generation draws
+    ``population`` points from a normal distribution fitted to the
+    ``elite`` fraction of the best orbits found so far (cross-entropy
+    method), clipped to the bounds.  Points are rounded to ``resolution``
+    (per element, defaults RESOLUTION) so repeated draws are scored once
+    and reruns hit the orbit cache.  Stops after ``budget`` evaluations or
+    a generation without new points.
+
+    ``workers`` and ``batch`` are passed to sweep() for each generation.
+    Yields (index, raan, inc, score) like coarse_to_fine(), with the
+    sampled elements in ``score["elements"]``.
+    """
+    rng = np.random.default_rng(seed)
+    unknown = set(bounds) - set(ELEMENTS)
+    if unknown:
+        raise ValueError(f"Unknown orbital elements {sorted(unknown)}; expected some of {ELEMENTS}")
+    if "raan" not in bounds or "inc" not in bounds:
+        raise ValueError("bounds needs 'raan' and 'inc' ranges")
+    names = [name for name in ELEMENTS if name in bounds]
+    lo = np.array([bounds[name][0] for name in names], float)
+    hi = np.array([bounds[name][1] for name in names], float)
+    step = np.array([{**RESOLUTION, **(resolution or {})}[name] for name in names], float)
+    population = population or max(10, budget // 8)
+    # point -> (quality, index)
+    seen = {}
+
+    def snap(points):
+        points = np.clip(points, lo, hi)
+        return np.clip(lo + np.round((points - lo) / step) * step, lo, hi)
+
+    def evaluate(points):
+        fresh = []
+        for point in map(tuple, np.round(snap(points), 12)):
+            if point not in seen and point not in fresh:
+                fresh.append(point)
+        fresh = fresh[:budget - len(seen)]
+        cells = []
+        for k, point in enumerate(fresh):
+            elements = dict(zip(names, point))
+            raan = elements.pop("raan")
+            inc = elements.pop("inc") % (2*np.pi)
+            cells.append((len(seen) + k, raan, inc, elements))
+        for point, cell in zip(fresh, cells):
+            seen[point] = (-np.inf, cell[0])
+        for index, raan, inc, score in sweep(cells, job, workers, batch=batch):
+            cell = cells[index - cells[0][0]]
+            seen[fresh[index - cells[0][0]]] = (score["quality"], index)
+            score["elements"] = dict(cell[3])
+            yield index, raan, inc, score
+
+    # Latin hypercube: one point per stratum of every element, strata shuffled independently
+    strata = np.stack([rng.permutation(population) for _ in names], axis=1)
+    yield from evaluate(lo + (strata + rng.random(strata.shape)) / population * (hi - lo))
+
+    while len(seen) < budget:
+        # ties go to the earliest evaluation
+        ranked = sorted(seen, key=lambda p: (-seen[p][0], seen[p][1]))
+        elites = np.array(ranked[:max(2, int(len(ranked) * elite))])
+        mean = elites.mean(axis=0)
+        std = np.maximum(elites.std(axis=0), step)
+        before = len(seen)
+        yield from evaluate(rng.normal(mean, std, (population, len(names))))
+        if len(seen) == before:
+            break
@@ -1,23 +1,13 @@
 import numpy as np
-import pandas as pd
 import TLEconstructor   # must provide func(inc, eccen, raan)
 import time
+from grid_sweep import sweep, coarse_to_fine, sample_search
+from pareto import metrics_table
+from telemetry import Progress, reset, write_profile
 
 import STRAIGHTRUN as sr
-from importlib import import_module, reload 
 
 from settings import parameters
-import numpy as np
-
-def _count_unique_eclipse_nights(df_visible):
-    """Return how many distinct UTC dates appear while Eclipse % != '0%'."""
-    if "Time (EST)" not in df_visible.columns:
-        return 0
-    eclipse_rows = df_visible[df_visible["Eclipse %"] != "0%"]
-    if eclipse_rows.empty:
-        return 0
-    dates = eclipse_rows["Time (EST)"].astype(str).str.slice(0, 10)
-    return dates.drop_duplicates().shape[0]
 
 def optimize_orbit(
         airmass=1.6,
@@ -28,7 +18,18 @@ def optimize_orbit(
         w_palomar=0.25,
         w_snifs=0.25,
         default_night_code=2,
-        snifs_night_code=2
+        snifs_night_code=2,
+        workers=1,
+        search="grid",
+        budget=400,
+        top_k=4,
+        resolution_deg=0.5,
+        batch=None,
+        metrics_path=None,
+        bounds=None,
+        seed=0,
+        progress=True,
+        profile_path=None
     ):
     """
     Grid‑search RAAN & inclination to maximize weighted visibility quality.
@@ -49,6 +50,43 @@ def optimize_orbit(
         for Rubin, Mason, Palomar (default 2 = nautical twilight).
     * snifs_night_code : int
         Maximum code for SNIFS (default 3 = civil twilight).
+    * workers : int or None
+        Processes used for the sweep (default 1 = serial, None = all cores).
+        Cells are scored in parallel and streamed back as they finish; the
+        result is the same as the serial scan.
+    * search : str
+        "grid" scores every cell of the res × res grid.  "refine" scores a
+        res × res coarse grid, then refines around the ``top_k`` best cells
+        down to ``resolution_deg`` using at most ``budget`` evaluations in
+        total; the returned dict has the same keys.
+        "sample" searches up to six elements (RAAN, inclination and any of
+        eccentricity, argument of perigee, mean motion and mean anomaly
+        given in ``bounds``) with grid_sweep.sample_search(), spending
+        ``budget`` evaluations; the best dict also carries the sampled
+        elements under "elements".
+    * budget, top_k, resolution_deg
+        Evaluation budget, cells refined per level and final step (degrees)
+        for search="refine".  ``budget`` also caps search="sample".
+    * bounds : dict or None
+        (low, high) ranges for search="sample", keyed by grid_sweep.ELEMENTS
+        ("eccen", "argpo", "no_kozai", "mo"; radians, radians/minute).
+        RAAN and inclination default to the grid's 0–360° and −30…+10°.
+    * seed : int
+        Random seed of search="sample".
+    * progress : bool
+        Show a live line with the orbits done, orbits/s, ETA and best
+        quality (default True).
+    * profile_path : str or None
+        Where to save the per-stage timing profile of the run (SGP4,
+        frames, twilight, eclipse, DataFrame, scoring, orbit cache...) and
+        its orbits/s; JSON, or CSV when the name ends in .csv.
+    * batch : int or None
+        Candidates propagated together through one SGP4 SatrecArray
+        (default None = one TLEconstructor.func call per cell).
+    * metrics_path : str or None
+        Where to save every evaluated orbit's per-telescope visibility and
+        eclipse nights (pareto.metrics_table(), .npz).  pareto.py finds the
+        Pareto front and re-ranks them for other weights without propagating.
     """
     # ----- validate weights -----
     weight_sum = w_rubin + w_mason + w_palomar + w_snifs
@@ -67,73 +105,79 @@ def optimize_orbit(
     z_lim = np.arccos(1/airmass)
     alt_threshold = 90 - np.degrees(z_lim)
 
-    telescopes = ["Rubin", "Mason", "Palomar", "SNIFFS"]
     night_limits = {
         "Rubin": default_night_code,
         "Mason": default_night_code,
         "Palomar": default_night_code,
-        "SNIFFS": snifs_night_code
+        "SNIFS": snifs_night_code
     }
     weights = {
         "Rubin": w_rubin,
         "Mason": w_mason,
         "Palomar": w_palomar,
-        "SNIFFS": w_snifs
+        "SNIFS": w_snifs
     }
 
+    job = dict(
+        alt_threshold=alt_threshold,
+        night_limits=night_limits,
+        weights=weights,
+        weight_per_night=weight_per_night
+    )
+    if search == "grid":
+        grid = [(raan, inc) for raan in raan_list for inc in incl_list]
+        cells = [(k, raan, inc) for k, (raan, inc) in enumerate(grid)]
+        results = sweep(cells, job, workers, batch=batch)
+        total = len(cells)
+    elif search == "refine":
+        results = coarse_to_fine(job, (0, 2*np.pi), (-30*np.pi/180, 10*np.pi/180), res, budget,
+                                 top_k, np.radians(resolution_deg), workers, batch)
+        total = budget
+    elif search == "sample":
+        bounds = {"raan": (0, 2*np.pi), "inc": (-30*np.pi/180, 10*np.pi/180), **(bounds or {})}
+        results = sample_search(job, bounds, budget, seed=seed, workers=workers, batch=batch)
+        total = budget
+    else:
+        raise ValueError(f"search must be 'grid', 'refine' or 'sample'.  Got {search!r}")
+
     best = None
     best_quality = -np.inf
-    total = len(raan_list) * len(incl_list)
-    processed = 0
+    best_index = None
+    evaluated = []
     start = time.time()
+    reset()
+    bar = Progress(total, enabled=progress)
 
     print("Scanning RAAN × inclination grid…")
-    for raan in raan_list:
-        for inc in incl_list:
-            df = TLEconstructor.func(inc, 0, raan)
-
-            vis_pct = {}
-            nights  = {}
-            for tel in telescopes:
-                alt_col  = f"{tel} Alt (Deg)"
-                time_col = f"{tel} TIME"
-
-                # rows with telescope night ≤ night_limit
-                night_mask = df[time_col] < night_limits[tel]
-                total_night_pts = np.count_nonzero(night_mask)
-
-                # visible: night_mask & altitude > threshold
-                vis_mask = night_mask & (df[alt_col] > alt_threshold)
-                visible_pts = np.count_nonzero(vis_mask)
-                vis_pct[tel] = (visible_pts / total_night_pts * 100) if total_night_pts else 0
-
-                nights[tel] = _count_unique_eclipse_nights(df.loc[vis_mask])
-
-            # weighted mean visibility
-            weighted_vis = sum(weights[t] * vis_pct[t] for t in telescopes)
-            avg_nights   = np.mean([nights[t] for t in telescopes])
-
-            quality = weighted_vis + weight_per_night * avg_nights
-            if quality > best_quality:
-                best_quality = quality
-                best = dict(
-                    RAAN_rad      = raan,
-                    Incl_rad      = inc,
-                    RAAN_deg      = np.degrees(raan),
-                    Incl_deg      = np.degrees(inc if inc <= np.pi else inc - 2*np.pi),
-                    weighted_vis  = weighted_vis,
-                    avg_nights    = avg_nights,
-                    vis_pct       = vis_pct,
-                    eclipse_nights= nights,
-                    quality       = quality
-                )
-
-            processed += 1
-            if processed % 20 == 0:
-                pct = processed / total * 100
-                print(f"\r{pct:5.1f}% completed  best Q={best_quality:.2f}", end="", flush=True)
-
-    print(f"\nDone in {time.time() - start:.1f} s")
+    for index, raan, inc, score in results:
+        quality = score["quality"]
+        evaluated.append((index, raan, inc, score))
+        # ties go to the earliest cell, as in a serial raan-major scan
+        if quality > best_quality or (quality == best_quality and index < best_index):
+            best_quality = quality
+            best_index = index
+            best = dict(
+                RAAN_rad      = raan,
+                Incl_rad      = inc,
+                RAAN_deg      = np.degrees(raan),
+                Incl_deg      = np.degrees(inc if inc <= np.pi else inc - 2*np.pi),
+                weighted_vis  = score["weighted_vis"],
+                avg_nights    = score["avg_nights"],
+                vis_pct       = score["vis_pct"],
+                eclipse_nights= score["eclipse_nights"],
+                quality       = quality
+            )
+            if "elements" in score:
+                best["elements"] = score["elements"]
+
+        bar.update(note=f"best Q={best_quality:.2f}")
+
+    bar.close()
+    print(f"Done in {time.time() - start:.1f} s")
+    if metrics_path is not None:
+        metrics_table(evaluated, metrics_path)
+    if profile_path is not None:
+        write_profile(profile_path, len(evaluated), time.time() - start)
     return best
 
 if __name__ == "__main__":
@@ -141,7 +185,10 @@ if __name__ == "__main__":
         airmass=1.6,
         res=30, # EDIT
         weight_per_night=0, # EDIT
-        w_rubin=0, w_mason=0, w_palomar=0, w_snifs=1
+        w_rubin=0, w_mason=0, w_palomar=0, w_snifs=1,
+        workers=None, # EDIT: processes for the sweep, None = all cores
+        metrics_path="orbit_metrics.npz", # re-rank with pareto.py, no new propagation
+        profile_path="orbit_profile.json" # where the sweep's time went, per stage
     )
     print("\nBest orbit found:")
     print(f"  RAAN  : {result['RAAN_deg']:.2f}°")
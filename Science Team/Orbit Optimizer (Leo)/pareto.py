@@ -0,0 +1,136 @@
+import numpy as np
+from rescore import best_orbit
+
+
+def metrics_table(results, path=None):
+    """
+    Per-telescope metrics of every evaluated orbit, in compact form.
+
+    ``results`` are the (index, raan, inc, score) tuples of grid_sweep.sweep(),
+    coarse_to_fine() or sample_search(), in any order.  Returns a dict of arrays sorted by
+    ``index``:
+
+    * ``index`` (orbits,) evaluation / grid index
+    * ``raan`` / ``inc`` (orbits,) in radians, ``inc`` wrapped as func() takes it
+    * ``telescopes`` (telescopes,) names, in the scorer's weight order
+    * ``vis_pct`` (orbits, telescopes) float64 night visibility percentages
+    * ``eclipse_nights`` (orbits, telescopes) int64 eclipse nights
+    * one (orbits,) column per further sampled element (``eccen``,
+      ``argpo``, ...) when the scores carry them (search="sample")
+
+    None of it depends on the weights, so rerank() can score the orbits for
+    any weight vector.  Saved to ``path`` (.npz) when given.
+    """
+    results = sorted(results, key=lambda r: r[0])
+    telescopes = list(results[0][3]["vis_pct"]) if results else []
+    table = dict(
+        index=np.array([r[0] for r in results], np.int64),
+        raan=np.array([r[1] for r in results], float),
+        inc=np.array([r[2] for r in results], float),
+        telescopes=np.array(telescopes),
+        vis_pct=np.array([[r[3]["vis_pct"][tel] for tel in telescopes] for r in results], float)
+                  .reshape(len(results), len(telescopes)),
+        eclipse_nights=np.array([[r[3]["eclipse_nights"][tel] for tel in telescopes] for r in results], np.int64)
+                         .reshape(len(results), len(telescopes))
+    )
+    for name in results[0][3].get("elements", {}) if results else ():
+        table[name] = np.array([r[3]["elements"][name] for r in results], float)
+    if path is not None:
+        np.savez(path, **table)
+    return table
+
+
+def load_metrics(path):
+    """Table saved by metrics_table() (or optimize_orbit's ``metrics_path``)."""
+    with np.load(path) as data:
+        return {k: data[k] for k in data.files}
+
+
+def objectives(table):
+    """
+    (orbits, telescopes + 1) array maximized by the optimizer: each
+    telescope's visibility percentage, then the average eclipse nights.
+    """
+    return np.column_stack([table["vis_pct"], table["eclipse_nights"].mean(axis=1)])
+
+
+def pareto_front(table):
+    """
+    Row numbers (ascending) of the non-dominated orbits of ``table``.
+
+    An orbit is dominated when another is at least as good on every
+    objectives() column and better on one.  For non-negative weights the
+    best orbit of any rerank() is on the front (up to ties), so the front is
+    the whole set of trade-offs worth looking at.  ``table`` may be a
+    metrics_table() or rescore tables merged with score_grid() output.
+
+    Sort-filter skyline: rows are visited by decreasing objective sum, so a
+    row can only be dominated by one already on the front and is compared
+    against the front alone, not against every other orbit.
+    """
+    points = objectives(table)
+    # Descending sum; ties broken lexicographically so a dominating row still comes first
+    keys = [-points[:, j] for j in reversed(range(points.shape[1]))] + [-points.sum(axis=1)]
+    order = np.lexsort(keys)
+
+    front = np.empty(points.shape)
+    rows = []
+    for k in order:
+        found = front[:len(rows)]
+        if not np.any(np.all(found >= points[k], axis=1) & np.any(found > points[k], axis=1)):
+            front[len(rows)] = points[k]
+            rows.append(k)
+    return np.sort(np.array(rows, np.int64))
+
+
+def rerank(table, weights=None, weight_per_night=20):
+    """
+    Score every orbit of ``table`` for one weight vector, without propagating.
+
+    ``weights`` is keyed by telescope name (default equal weights) and must
+    sum to 1, like optimize_orbit's w_rubin … w_snifs.  Returns score_grid()'s
+    dict of arrays: 'quality', 'weighted_vis', 'avg_nights' (orbits,) and
+    'vis_pct', 'eclipse_nights' (orbits, telescopes).  The quality is the
+    same number optimize_orbit computes for these weights.
+    """
+    telescopes = table["telescopes"].tolist()
+    weights = weights or {tel: 1 / len(telescopes) for tel in telescopes}
+    weight_sum = sum(weights.values())
+    if not np.isclose(weight_sum, 1.0, atol=1e-6):
+        raise ValueError(
+            f"Visibility weights must sum to 1.  Got {weight_sum:.3f}"
+        )
+
+    # Same operations, in the same order, as grid_sweep.score_orbit
+    weighted_vis = sum(weights[t] * table["vis_pct"][:, telescopes.index(t)] for t in weights)
+    avg_nights = table["eclipse_nights"].mean(axis=1)
+    return dict(
+        quality=weighted_vis + weight_per_night * avg_nights,
+        weighted_vis=weighted_vis,
+        avg_nights=avg_nights,
+        vis_pct=table["vis_pct"],
+        eclipse_nights=table["eclipse_nights"]
+    )
+
+
+def best_reranked(table, weights=None, weight_per_night=20):
+    """optimize_orbit's ``best`` dict for ``weights``, from ``table`` alone."""
+    return best_orbit(table, rerank(table, weights, weight_per_night))
+
+
+if __name__ == "__main__":
+    import sys
+    table = load_metrics(sys.argv[1] if len(sys.argv) > 1 else "orbit_metrics.npz")
+    front = pareto_front(table)
+    telescopes = table["telescopes"].tolist()
+    print(f"{len(front)} of {len(table['index'])} orbits on the Pareto front")
+    for k in front:
+        inc = table["inc"][k]
+        print(f"  RAAN {np.degrees(table['raan'][k]):7.2f}°  "
+              f"Incl {np.degrees(inc if inc <= np.pi else inc - 2*np.pi):7.2f}°  "
+              + "  ".join(f"{tel} {table['vis_pct'][k, j]:5.1f}%/{table['eclipse_nights'][k, j]}n"
+                          for j, tel in enumerate(telescopes)))
+
+    for tel in telescopes:
+        best = best_reranked(table, {t: float(t == tel) for t in telescopes}, weight_per_night=0)
+        print(f"{tel} only: RAAN {best['RAAN_deg']:.2f}°  Incl {best['Incl_deg']:.2f}°  Q={best['quality']:.2f}")
@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+import TLEconstructor   # also puts the shared propagation folder on sys.path
+from settings import parameters
+from sites import OPTIMIZER_SITES, SiteArray
+from propagation import grid_datetime64, grid_twilight
+from grid_sweep import sweep, cell_tables, SITE_NAMES
+from score_kernel import day_index
+
+TELESCOPES = SITE_NAMES
+# Orbits scored per NumPy pass; bounds the (cells, telescopes, samples) temporaries
+BLOCK = 64
+
+
+def propagate_grid(raan_list, incl_list, telescopes=TELESCOPES, workers=1, path=None, batch=None):
+    """
+    Stage one: propagate every (RAAN, inclination) cell once.
+
+    Keeps only what scoring needs, in compact form:
+
+    * ``alt`` (cells, telescopes, samples) float32 altitudes
+    * ``shadow`` (cells, samples) bool, satellite in shadow
+    * ``twilight`` (telescopes, samples) int8 ``dark_twilight_day`` codes,
+      which do not depend on the orbit
+    * ``day`` (samples,) int32 index of the local calendar date, used to
+      count eclipse nights
+    * ``raan`` / ``inc`` (cells,) in radians, raan-major like optimize_orbit
+
+    Cells run through grid_sweep.sweep(), so ``workers`` and ``batch`` work
+    as in optimize_orbit.  The tables are saved to ``path`` (.npz) when given.
+    """
+    grid = [(raan, inc) for raan in raan_list for inc in incl_list]
+    cells = [(k, raan, inc) for k, (raan, inc) in enumerate(grid)]
+
+    job = {"telescopes": telescopes}
+    alt = shadow = None
+    for index, raan, inc, (cell_alt, cell_shadow) in sweep(cells, job, workers, task=cell_tables, batch=batch):
+        if alt is None:
+            alt = np.zeros((len(cells),) + cell_alt.shape, np.float32)
+            shadow = np.zeros((len(cells), cell_shadow.size), bool)
+        alt[index] = cell_alt
+        shadow[index] = cell_shadow
+
+    # Same for every orbit: the cached grid tables the cells were built with
+    sites = [next(site for site in OPTIMIZER_SITES if site["name"] == tel) for tel in telescopes]
+    twilight = np.stack(grid_twilight(SiteArray(sites), telescopes, parameters))
+    day = day_index(pd.DatetimeIndex(grid_datetime64(parameters)).tz_localize('UTC').tz_convert(parameters.timezone))
+
+    tables = dict(
+        raan=np.array([c[1] for c in cells]),
+        inc=np.array([c[2] for c in cells]),
+        telescopes=np.array(telescopes),
+        alt=alt,
+        shadow=shadow,
+        twilight=twilight,
+        day=day
+    )
+    if path is not None:
+        np.savez(path, **tables)
+    return tables
+
+
+def load_grid(path):
+    """Tables saved by propagate_grid()."""
+    with np.load(path) as data:
+        return {k: data[k] for k in data.files}
+
+
+def score_grid(tables, airmass=1.6, weight_per_night=20, weights=None, night_limits=None):
+    """
+    Stage two: score every cell of ``tables`` for one parameter set.
+
+    ``weights`` and ``night_limits`` are keyed by telescope name (defaults:
+    equal weights and night code 2).  Uses the same definitions as
+    optimize_orbit, as array operations over the whole grid.  Returns a
+    dict of arrays: 'quality', 'weighted_vis', 'avg_nights' (cells,) and
+    'vis_pct', 'eclipse_nights' (cells, telescopes).
+    """
+    telescopes = tables["telescopes"].tolist()
+    weights = weights or {tel: 1 / len(telescopes) for tel in telescopes}
+    night_limits = night_limits or {}
+    w = np.array([weights[tel] for tel in telescopes])
+    limits = np.array([night_limits.get(tel, 2) for tel in telescopes])
+
+    alt_threshold = 90 - np.degrees(np.arccos(1/airmass))
+    night = tables["twilight"] < limits[:, None]
+    total_night = np.count_nonzero(night, axis=1)
+    # First sample of each local date, for per-night reductions
+    day_starts = np.flatnonzero(np.diff(tables["day"], prepend=-1))
+
+    cells = len(tables["raan"])
+    vis_pct = np.zeros((cells, len(telescopes)))
+    nights = np.zeros((cells, len(telescopes)), np.int64)
+    for lo in range(0, cells, BLOCK):
+        vis = (tables["alt"][lo:lo + BLOCK] > alt_threshold) & night
+        visible = np.count_nonzero(vis, axis=2)
+        vis_pct[lo:lo + BLOCK] = np.divide(visible * 100, total_night,
+                                           out=np.zeros(visible.shape), where=total_night > 0)
+        eclipsed = vis & tables["shadow"][lo:lo + BLOCK, None, :]
+        nights[lo:lo + BLOCK] = np.logical_or.reduceat(eclipsed, day_starts, axis=2).sum(axis=2)
+
+    weighted_vis = vis_pct @ w
+    avg_nights = nights.mean(axis=1)
+    return dict(
+        quality=weighted_vis + weight_per_night * avg_nights,
+        weighted_vis=weighted_vis,
+        avg_nights=avg_nights,
+        vis_pct=vis_pct,
+        eclipse_nights=nights
+    )
+
+
+def best_orbit(tables, scores):
+    """optimize_orbit's ``best`` dict for the highest-quality cell (first on ties)."""
+    k = int(np.argmax(scores["quality"]))
+    raan, inc = tables["raan"][k], tables["inc"][k]
+    telescopes = tables["telescopes"].tolist()
+    return dict(
+        RAAN_rad      = raan,
+        Incl_rad      = inc,
+        RAAN_deg      = np.degrees(raan),
+        Incl_deg      = np.degrees(inc if inc <= np.pi else inc - 2*np.pi),
+        weighted_vis  = scores["weighted_vis"][k],
+        avg_nights    = scores["avg_nights"][k],
+        vis_pct       = dict(zip(telescopes, scores["vis_pct"][k])),
+        eclipse_nights= dict(zip(telescopes, scores["eclipse_nights"][k].tolist())),
+        quality       = scores["quality"][k]
+    )
+
+
+if __name__ == "__main__":
+    res = 30 # EDIT
+    incl_list = np.linspace(-30*np.pi/180, 10*np.pi/180, res)
+    incl_list = np.where(incl_list < 0, 2*np.pi + incl_list, incl_list)  # wrap
+    raan_list = np.linspace(0, 2*np.pi, res)
+
+    tables = propagate_grid(raan_list, incl_list, workers=None, path='grid_tables.npz')
+    for airmass in (1.6, 2.0):
+        best = best_orbit(tables, score_grid(tables, airmass=airmass, weight_per_night=0))
+        print(f"airmass {airmass}: RAAN {best['RAAN_deg']:.2f}°  Incl {best['Incl_deg']:.2f}°  "
+              f"Q={best['quality']:.2f}")
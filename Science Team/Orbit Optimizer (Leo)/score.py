@@ -1,7 +1,8 @@
 import numpy as np
-import pandas as pd
 import math
 import TLEconstructor   # This module must define the function func(inc, eccen, node)
+from eclipse import in_shadow
+from score_kernel import day_index, visibility_counts
 
 def orbit_score(raan, inc, eccen=0, airmass=2.0):
     """
@@ -41,43 +42,28 @@ def orbit_score(raan, inc, eccen=0, airmass=2.0):
     telescopes = ["Rubin", "Mason", "Palomar", "SNIFS"]
     results = {}
     
-    for tel in telescopes:
-        alt_col = f"{tel} Alt (Deg)"
-        time_col = f"{tel} TIME"
-        
-        # Filter to times when the telescope is in "night" (TIME < 2).
-        # Match runbaby.py logic: use NumPy size counting on conditions
-        time_array = df[time_col].to_numpy()
-        alt_array = df[alt_col].to_numpy()
-        eclipse_array = df["Eclipse %"].to_numpy()
+    # Nighttime condition (TIME < 2), all telescopes counted in one pass
+    alt = np.stack([df[f"{tel} Alt (Deg)"].to_numpy() for tel in telescopes])
+    night = np.stack([df[f"{tel} TIME"].to_numpy() < 2 for tel in telescopes])
+    if "Time (EST)" in df.columns:
+        day = day_index(df["Time (EST)"])
+        shadow = in_shadow(df["Eclipse (Frac)"].to_numpy())
+    else:
+        day = shadow = None
+    total, visible, eclipsed = visibility_counts(alt, night, shadow, day, threshold_alt)
 
-        # Nighttime condition
-        night_mask = time_array < 2
-        total_night_points = np.count_nonzero(night_mask)
-
-        # Visible during night and above altitude threshold
-        vis_mask = (time_array < 2) & (alt_array > threshold_alt)
-        visible_points = np.count_nonzero(vis_mask)
+    for k, tel in enumerate(telescopes):
+        total_night_points = total[k]
+        visible_points = visible[k]
         vis_percentage = (visible_points / total_night_points * 100) if total_night_points > 0 else 0
 
-        # Eclipse condition within visible points
-        eclipse_mask = vis_mask & (eclipse_array != "0%")
-        eclipse_indices = np.where(eclipse_mask)[0]
-
-        if "Time (EST)" in df.columns:
-            eclipse_dates = pd.Series(df["Time (EST)"].iloc[eclipse_indices]).astype(str).str.slice(0, 10)
-            eclipse_nights = eclipse_dates.drop_duplicates().shape[0]
-        else:
-            eclipse_nights = 0
-
         results[tel] = {
             "visibility_percentage": vis_percentage,
-            "eclipse_nights": eclipse_nights,
+            "eclipse_nights": int(eclipsed[k]),
             "visible_points": visible_points,
             "total_night_points": total_night_points
         }
 
-    
     # Compute average metrics across telescopes.
     avg_visibility = np.mean([results[tel]["visibility_percentage"] for tel in telescopes])
     avg_eclipse_nights = np.mean([results[tel]["eclipse_nights"] for tel in telescopes])
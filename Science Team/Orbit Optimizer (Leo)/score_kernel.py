@@ -0,0 +1,61 @@
+import hashlib
+import numpy as np
+import pandas as pd
+
+# day_index() arrays per time grid, kept for the life of the process
+_days = {}
+
+
+def day_index(times):
+    """
+    int32 index (0, 1, ...) of the local calendar date of every sample.
+
+    ``times`` is the 'Time (EST)' column of a func() table.  Dates are the
+    ones the scorers used to slice from ``str(time)[:10]``, i.e. in the
+    column's own timezone.  Every orbit on a time grid shares one array,
+    looked up by a digest of every timestamp and the timezone, so grids
+    that differ only inside (adaptive or refined sampling) never share one.
+    """
+    if not pd.api.types.is_datetime64_any_dtype(times):
+        dates = pd.Series(times).astype(str).str.slice(0, 10).to_numpy()
+        return np.unique(dates, return_inverse=True)[1].astype(np.int32).ravel()
+
+    times = pd.DatetimeIndex(times)
+    key = (str(times.tz), hashlib.sha1(times.asi8.tobytes()).hexdigest())
+    day = _days.get(key)
+    if day is None:
+        local = times.tz_localize(None) if times.tz is not None else times
+        days = local.values.astype('datetime64[D]').astype(np.int64)
+        day = np.unique(days, return_inverse=True)[1].astype(np.int32).ravel()
+        _days[key] = day
+    return day
+
+
+def visibility_counts(alt, night, shadow, day, alt_threshold):
+    """
+    Per-telescope visibility counts of one orbit, every telescope at once.
+
+    ``alt`` and ``night`` are (telescopes, samples) altitudes in degrees and
+    night masks, ``shadow`` a (samples,) in-shadow mask and ``day`` the
+    day_index() of the samples (None counts no eclipse nights, as for a
+    table without times).  Returns three int arrays (telescopes,): night
+    samples, visible samples (night and above ``alt_threshold``) and
+    distinct local dates with a visible sample in shadow.
+    """
+    visible = night & (alt > alt_threshold)
+    total_night = np.count_nonzero(night, axis=1)
+    visible_points = np.count_nonzero(visible, axis=1)
+    if day is None or not len(day):
+        return total_night, visible_points, np.zeros(len(alt), np.int64)
+
+    # One histogram bin per (telescope, date); a date counts once it has any eclipsed sample
+    days = int(day.max()) + 1
+    tel, sample = np.nonzero(visible & shadow)
+    hits = np.bincount(tel * days + day[sample], minlength=len(alt) * days)
+    nights = np.count_nonzero(hits.reshape(len(alt), days), axis=1)
+    return total_night, visible_points, nights
+
+
+def clear_memory():
+    """Drop the cached day_index() arrays."""
+    _days.clear()
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+from pareto import objectives, pareto_front
+
+
+def brute_force_front(table):
+    # Every orbit against every other one
+    points = objectives(table)
+    return [k for k, p in enumerate(points)
+            if not any(np.all(q >= p) and np.any(q > p) for q in points)]
+
+
+def random_table(orbits, telescopes=4, levels=None, seed=0):
+    """metrics_table()-like table; small ``levels`` give many ties and duplicate rows."""
+    rng = np.random.default_rng(seed)
+    if levels:
+        vis_pct = rng.integers(0, levels, (orbits, telescopes)) * 10.0
+    else:
+        vis_pct = rng.uniform(0, 100, (orbits, telescopes))
+    return dict(telescopes=np.array([f"T{j}" for j in range(telescopes)]),
+                vis_pct=vis_pct,
+                eclipse_nights=rng.integers(0, levels or 30, (orbits, telescopes)))
+
+
+@pytest.mark.parametrize("orbits, telescopes, levels", [
+    (200, 4, None),
+    (200, 4, 3),
+    (300, 2, 4),
+    (50, 1, 2),
+    (1, 4, None),
+])
+@pytest.mark.parametrize("seed", range(3))
+def test_matches_brute_force(orbits, telescopes, levels, seed):
+    table = random_table(orbits, telescopes, levels, seed)
+    front = pareto_front(table)
+    assert front.dtype == np.int64
+    assert front.tolist() == brute_force_front(table)
+
+
+def test_duplicates_all_kept():
+    table = random_table(5)
+    for name in ("vis_pct", "eclipse_nights"):
+        table[name][:] = table[name][0]
+    assert pareto_front(table).tolist() == [0, 1, 2, 3, 4]
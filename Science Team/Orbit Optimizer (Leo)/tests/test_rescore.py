@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+from grid_sweep import score_orbit, SITE_NAMES   # also puts the shared propagation folder on sys.path
+from eclipse import in_shadow
+from rescore import score_grid
+from score_kernel import day_index
+
+
+def func_tables(cells=7, days=3, seed=0):
+    """
+    func()-shaped DataFrames of ``cells`` made-up orbits on one 10-minute
+    grid, and the rescore tables propagate_grid() would keep of them.
+    """
+    rng = np.random.default_rng(seed)
+    times = pd.Series(pd.date_range("2029-03-20", periods=days * 144, freq="10min", tz="US/Eastern"))
+    size = len(times)
+    twilight = rng.integers(0, 5, (len(SITE_NAMES), size)).astype(np.int8)
+
+    frames, alts, shadows = [], [], []
+    for _ in range(cells):
+        alt = rng.uniform(-90, 90, (len(SITE_NAMES), size)).astype(np.float32)
+        # Mostly sunlit, some penumbra (including fractions below the shadow threshold) and umbra
+        eclipse = np.where(rng.random(size) < 0.95, 0, rng.choice([0.001, 0.004, 0.3, 1.0], size)).astype(np.float32)
+        columns = {"Time (EST)": times, "Eclipse (Frac)": eclipse}
+        for k, tel in enumerate(SITE_NAMES):
+            columns[f"{tel} Alt (Deg)"] = alt[k]
+            columns[f"{tel} TIME"] = twilight[k]
+        frames.append(pd.DataFrame(columns))
+        alts.append(alt)
+        shadows.append(in_shadow(eclipse))
+
+    tables = dict(
+        raan=np.linspace(0, 2*np.pi, cells),
+        inc=np.zeros(cells),
+        telescopes=np.array(SITE_NAMES),
+        alt=np.stack(alts),
+        shadow=np.stack(shadows),
+        twilight=twilight,
+        day=day_index(times),
+    )
+    return frames, tables
+
+
+@pytest.mark.parametrize("airmass, weight_per_night, weights, night_limits", [
+    (1.6, 20, None, None),
+    (2.0, 0, {"Rubin": 0.4, "Mason": 0.1, "Palomar": 0.2, "SNIFS": 0.3}, {"Rubin": 3, "SNIFS": 1}),
+])
+def test_score_grid_matches_score_orbit(airmass, weight_per_night, weights, night_limits):
+    frames, tables = func_tables()
+    scores = score_grid(tables, airmass, weight_per_night, weights, night_limits)
+
+    weights = weights or {tel: 1 / len(SITE_NAMES) for tel in SITE_NAMES}
+    limits = {tel: (night_limits or {}).get(tel, 2) for tel in SITE_NAMES}
+    alt_threshold = 90 - np.degrees(np.arccos(1/airmass))
+    for k, df in enumerate(frames):
+        expected = score_orbit(df, alt_threshold, limits, weights, weight_per_night)
+        assert scores["vis_pct"][k] == pytest.approx([expected["vis_pct"][tel] for tel in SITE_NAMES])
+        assert scores["eclipse_nights"][k].tolist() == [expected["eclipse_nights"][tel] for tel in SITE_NAMES]
+        assert scores["weighted_vis"][k] == pytest.approx(expected["weighted_vis"])
+        assert scores["avg_nights"][k] == pytest.approx(expected["avg_nights"])
+        assert scores["quality"][k] == pytest.approx(expected["quality"])
@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+from score_kernel import day_index
+
+
+def reference_days(times):
+    # The per-sample date strings the scorers used to slice
+    dates = pd.Series(times).astype(str).str.slice(0, 10).to_numpy()
+    return np.unique(dates, return_inverse=True)[1].ravel()
+
+
+def test_grids_with_shared_endpoints_get_their_own_index():
+    start, end = pd.Timestamp("2029-03-20", tz="US/Eastern"), pd.Timestamp("2029-03-23", tz="US/Eastern")
+    uniform = pd.Series(pd.date_range(start, end, periods=7))
+    # Same length and endpoints, samples bunched on the first day
+    refined = pd.Series(pd.DatetimeIndex([start + pd.Timedelta(hours=h) for h in (0, 2, 4, 6, 8, 10)] + [end]))
+
+    for times in (uniform, refined, uniform):
+        np.testing.assert_array_equal(day_index(times), reference_days(times))
+
+
+def test_timezone_is_part_of_the_key():
+    utc = pd.Series(pd.date_range("2029-03-20 02:00", periods=6, freq="h", tz="UTC"))
+    eastern = utc.dt.tz_convert("US/Eastern")
+    np.testing.assert_array_equal(day_index(utc), reference_days(utc))
+    np.testing.assert_array_equal(day_index(eastern), reference_days(eastern))
@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+from skyfield import almanac
+from skyfield.api import EarthSatellite
+from skyfield.searchlib import find_discrete
+from settings import parameters
+from resources import timescale, ephemeris
+from eclipse import eclipse_fraction, in_shadow
+from propagation_result import utc_datetime64
+from satellite import make_satrec
+from sites import OPTIMIZER_SITES, site_positions
+
+EVENT_LABELS = {
+    "Above": {0: "set", 1: "rise"},
+    "In Shadow": {0: "egress", 1: "ingress"},
+    "TIME": almanac.TWILIGHTS,
+}
+
+
+def state_functions(sat, eph, alt_threshold, step_days, sites=OPTIMIZER_SITES):
+    """
+    Discrete state functions of time for ``find_discrete``.
+
+    Returns a list of (source, quantity, f) where f maps a skyfield Time
+    array to small integers: whether the satellite is above ``alt_threshold``
+    at each site, each site's ``dark_twilight_day`` code, and whether the
+    satellite is in shadow.
+    """
+    sun, earth = eph['sun'], eph['earth']
+    functions = []
+    for site, pos in zip(sites, site_positions(sites)):
+        difference = sat - pos
+
+        def above(t, difference=difference):
+            alt, az, trash = difference.at(t).altaz()
+            return (alt.degrees > alt_threshold).astype(np.int8)
+        above.step_days = step_days
+
+        functions.append((site["name"], "Above", above))
+        functions.append((site["name"], "TIME", almanac.dark_twilight_day(eph, pos)))
+
+    def shadow(t):
+        frac = eclipse_fraction(sat.at(t).position.au, earth.at(t).position.au, sun.at(t).position.au)
+        return in_shadow(frac).astype(np.int8)
+    shadow.step_days = step_days
+
+    functions.append(("Satellite", "In Shadow", shadow))
+    return functions
+
+
+def propagate_adaptive(inc, eccen, nodeo, airmass=2.0, step_minutes=10, epsilon_seconds=1.0,
+                       sites=OPTIMIZER_SITES):
+    """
+    Event-driven alternative to func() over the settings.json window.
+
+    Each state (altitude above the airmass limit per site, twilight code per
+    site, eclipse) is sampled every ``step_minutes`` and bisected down to
+    ``epsilon_seconds`` wherever it changes, so cost scales with the number
+    of events rather than with ``parameters.tdelta``.
+
+    Returns
+    -------
+    events : DataFrame
+        One row per state change: 'Time (UTC)', 'Source', 'Quantity',
+        'Value' (new state) and a readable 'Event' label.
+    segments : DataFrame
+        One row per interval of constant state: 'Start (UTC)', 'End (UTC)',
+        'Duration (s)' and one column per state (``{site} Above``,
+        ``{site} TIME``, 'In Shadow').
+    """
+    ts = timescale()
+    eph = ephemeris()
+    sat = EarthSatellite.from_satrec(make_satrec(inc, eccen, nodeo), ts)
+
+    alt_threshold = 90 - np.degrees(np.arccos(1/airmass))
+    t0, t1 = parameters.start, parameters.end
+    span = t1.tt - t0.tt
+    functions = state_functions(sat, eph, alt_threshold, step_minutes / 1440, sites)
+
+    rows = []
+    states = {}
+    for source, quantity, f in functions:
+        initial = int(f(ts.tt_jd(np.array([t0.tt])))[0])
+        times, values = find_discrete(t0, t1, f, epsilon=epsilon_seconds / 86400)
+        offsets = times.tt - t0.tt
+        states[source, quantity] = (initial, offsets, np.asarray(values, dtype=np.int8))
+        for offset, value in zip(offsets, values):
+            rows.append((offset, source, quantity, int(value), EVENT_LABELS[quantity][int(value)]))
+
+    rows.sort(key=lambda r: r[0])
+    event_offsets = np.array([r[0] for r in rows], dtype=np.float64)
+    events = pd.DataFrame({
+        'Time (UTC)': utc_datetime64(t0, event_offsets * 86400e3),
+        'Source': [r[1] for r in rows],
+        'Quantity': [r[2] for r in rows],
+        'Value': np.array([r[3] for r in rows], dtype=np.int8),
+        'Event': [r[4] for r in rows],
+    })
+
+    bounds = np.unique(np.concatenate([[0.0], event_offsets, [span]]))
+    seg_start, seg_end = bounds[:-1], bounds[1:]
+    segments = pd.DataFrame({
+        'Start (UTC)': utc_datetime64(t0, seg_start * 86400e3),
+        'End (UTC)': utc_datetime64(t0, seg_end * 86400e3),
+        'Duration (s)': (seg_end - seg_start) * 86400,
+    })
+    for (source, quantity), (initial, offsets, values) in states.items():
+        # State in force at each segment start: last event at or before it
+        idx = np.searchsorted(offsets, seg_start, side='right')
+        column = np.concatenate([[initial], values]).astype(np.int8)[idx]
+        name = quantity if source == "Satellite" else f"{source} {quantity}"
+        segments[name] = column.astype(bool) if quantity != "TIME" else column
+
+    return events, segments
+
+
+if __name__ == "__main__":
+    events, segments = propagate_adaptive(parameters.inclo, parameters.ecco, parameters.nodeo)
+    events.to_csv('output/events.csv', index=False)
+    segments.to_csv('output/segments.csv', index=False)
+    print(f"{len(events)} events, {len(segments)} segments")
@@ -0,0 +1,73 @@
+import numpy as np
+from sgp4.api import SatrecArray
+from skyfield.constants import AU_KM
+from settings import parameters
+from eclipse import eclipse_fraction
+from propagation_result import PropagationResult
+from satellite import make_satrec
+from sites import OPTIMIZER_SITES, SiteArray
+from frames import teme_positions, teme_to_gcrs_itrs, geodetic_latlon
+from propagation import grid_shape, grid_tables, grid_chunks
+from telemetry import stage
+
+
+def propagate_batch(elements, batch=64, sites=OPTIMIZER_SITES, names=None, config=parameters):
+    """
+    Propagate many candidate orbits over the ``config`` time window together.
+
+    ``elements`` is a sequence of make_satrec() argument tuples
+    (inc, eccen, nodeo[, no_kozai, argpo, mo]).  Each group of ``batch``
+    candidates is loaded into one SatrecArray and advanced by a single sgp4
+    call per chunk; the cached TEME→GCRS→ITRS rotations of the time grid are
+    applied to the whole group, and eclipse and site geometry run on the
+    stacked positions.  Yields one PropagationResult (no observer
+    topocentric arrays, like the optimizer's func()) per element, in order.
+    ``names`` relabels the sites in the results.
+    """
+    sitearray = SiteArray(sites)
+    names = names or sitearray.names
+    num_chunks, chunk_len = grid_shape(config)
+    size = num_chunks*chunk_len
+    twilight, sunearth, frametable = grid_tables(sitearray, names, config)
+    twilight = np.stack(twilight)
+
+    elements = list(elements)
+    for lo in range(0, len(elements), batch):
+        group = elements[lo:lo + batch]
+        satrecs = SatrecArray([make_satrec(*e, config=config) for e in group])
+        results = [PropagationResult(size, names, config.timezone, topocentric=False) for e in group]
+        for result in results:
+            result.site_twilight[:] = twilight
+
+        for sl, t, times in grid_chunks(config):
+            with stage('sgp4'):
+                teme = teme_positions(satrecs, t)
+
+            with stage('frames'):
+                gcrs, xyz_itrs = teme_to_gcrs_itrs(teme, frametable[..., sl])
+
+                # Stack the group along the sample axis: (3, C*N)
+                flat_gcrs = gcrs.transpose(1, 0, 2).reshape(3, -1)
+                flat_itrs = xyz_itrs.transpose(1, 0, 2).reshape(3, -1)
+
+            with stage('eclipse'):
+                sunpos = np.tile(sunearth[0, :, sl], len(group))
+                earthpos = np.tile(sunearth[1, :, sl], len(group))
+                eclipse = eclipse_fraction(flat_gcrs / AU_KM, earthpos, sunpos).reshape(len(group), -1)
+
+            with stage('frames'):
+                lat, lon = geodetic_latlon(flat_itrs)
+                lat, lon = lat.reshape(len(group), -1), lon.reshape(len(group), -1)
+                sitealt, siteaz = sitearray.altaz(flat_itrs)
+                sitealt = sitealt.reshape(len(sitearray), len(group), -1)
+                siteaz = siteaz.reshape(len(sitearray), len(group), -1)
+
+            for k, result in enumerate(results):
+                result.time[sl] = times
+                result.sat_xyz[:, sl] = gcrs[k]
+                result.sat_latlon[:, sl] = [lat[k], lon[k]]
+                result.eclipse[sl] = eclipse[k]
+                result.site_alt[:, sl] = sitealt[:, k]
+                result.site_az[:, sl] = siteaz[:, k]
+
+        yield from results
@@ -0,0 +1,51 @@
+import os
+import numpy as np
+
+
+class Checkpoint:
+    """
+    Preallocated sweep results that survive a crash.
+
+    Rows live in a memory-mapped ``<name>.partial.npy`` next to ``path`` and
+    a matching ``<name>.done.npy`` flags the rows already written, so a
+    restarted sweep skips every finished cell.  The flag is set after the
+    row, so a cell interrupted half-way is simply recomputed.  finish()
+    saves the completed array to ``path`` (as ``np.save`` did before) and
+    removes the partial files.
+    """
+
+    def __init__(self, path, shape):
+        self.path = path
+        stem = path[:-4] if path.endswith('.npy') else path
+        self.rows_path = stem + '.partial.npy'
+        self.done_path = stem + '.done.npy'
+
+        if os.path.exists(self.rows_path) and os.path.exists(self.done_path):
+            self.rows = np.load(self.rows_path, mmap_mode='r+')
+            self.done = np.load(self.done_path, mmap_mode='r+')
+            if self.rows.shape != tuple(shape):
+                raise ValueError(f"{self.rows_path} holds a {self.rows.shape} sweep, "
+                                 f"not {tuple(shape)}; delete it to start over")
+        else:
+            self.rows = np.lib.format.open_memmap(self.rows_path, mode='w+', dtype=np.float64, shape=shape)
+            self.done = np.lib.format.open_memmap(self.done_path, mode='w+', dtype=np.bool_, shape=shape[:1])
+
+    def completed(self):
+        """Number of rows already recorded."""
+        return int(np.count_nonzero(self.done))
+
+    def record(self, index, row):
+        """Store one finished cell."""
+        self.rows[index] = row
+        self.rows.flush()
+        self.done[index] = True
+        self.done.flush()
+
+    def finish(self):
+        """Save the full array to ``path``, drop the partial files and return it."""
+        rows = np.array(self.rows)
+        np.save(self.path, rows)
+        del self.rows, self.done
+        os.remove(self.rows_path)
+        os.remove(self.done_path)
+        return rows
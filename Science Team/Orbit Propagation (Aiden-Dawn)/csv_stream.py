@@ -0,0 +1,41 @@
+import os
+
+
+class CSVStream:
+    """
+    CSV outputs written one PropagationResult chunk at a time.
+
+    ``outputs`` maps a file path to a function turning a result into the
+    DataFrame for that file (e.g. ``PropagationResult.coord_frame``).  The
+    first write() creates each file with its header and later ones append
+    rows, so memory is bounded by one chunk and every completed chunk is
+    already on disk if the run is interrupted.  The files come out the same
+    as a single ``to_csv`` of the whole run.
+    """
+
+    def __init__(self, outputs):
+        self.outputs = dict(outputs)
+        self.files = {}
+        for path in self.outputs:
+            folder = os.path.dirname(path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            self.files[path] = open(path, 'w', newline='')
+        self.header = True
+
+    def write(self, result):
+        """Append the rows of one chunk to every output and flush them."""
+        for path, frame in self.outputs.items():
+            frame(result).to_csv(self.files[path], header=self.header, index=False)
+            self.files[path].flush()
+        self.header = False
+
+    def close(self):
+        for file in self.files.values():
+            file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,98 @@
+import numpy as np
+
+# Angular radii numerators (AU): solar radius and Earth equatorial radius
+SUN_RADIUS_AU = 0.00465047
+EARTH_RADIUS_AU = 4.26354e-5
+# Smallest fraction the old "N%" labels reported as nonzero (rounds to 1%)
+SHADOW_THRESHOLD = 0.005
+
+
+def _isclose(a, b):
+    # Same test as math.isclose with its default rel_tol
+    return np.abs(a - b) <= 1e-9 * np.maximum(np.abs(a), np.abs(b))
+
+
+def _normalize(v):
+    return v / np.linalg.norm(v, axis=0)
+
+
+def _dihedral(p, q, r):
+    """Angle at vertex p between the great circles p->q and p->r, for (3, M) unit vectors."""
+    nb = _normalize(np.cross(p, q - p, axis=0))
+    nc = _normalize(np.cross(p, r - p, axis=0))
+    return np.arccos(np.clip(np.sum(nb * nc, axis=0), -1.0, 1.0))
+
+
+def eclipse_fraction(satpos, earthpos, sunpos):
+    """
+    Fraction of the solar disk hidden by the Earth as seen from the satellite.
+
+    Array-in/array-out version of the old per-sample ``eclipse()`` helper.
+    All three inputs are (3, N) position blocks in AU, exactly as returned by
+    ``sat.at(t).position.au`` (geocentric) and ``earth.at(t).position.au`` /
+    ``sun.at(t).position.au`` (barycentric).  The annular, no-eclipse, total
+    and partial (digon) cases are selected with masks, so a whole chunk is
+    evaluated in one pass.
+
+    Returns a float32 array of length N with values in [0, 1].
+    """
+    satpos = np.asarray(satpos, dtype=np.float64)
+    earthpos = np.asarray(earthpos, dtype=np.float64)
+    sunpos = np.asarray(sunpos, dtype=np.float64)
+
+    satsun = sunpos - (satpos + earthpos)
+    satearth = -satpos
+    satsundist = np.linalg.norm(satsun, axis=0)
+    satearthdist = np.linalg.norm(satearth, axis=0)
+
+    asun = np.arctan(SUN_RADIUS_AU / satsundist)
+    aearth = np.arctan(EARTH_RADIUS_AU / satearthdist)
+    cos_theta = np.sum(satsun * satearth, axis=0) / (satearthdist * satsundist)
+    theta = np.arccos(np.clip(cos_theta, -1.0, 1.0))
+    sunsolid = np.pi * asun ** 2
+    earthsolid = np.pi * aearth ** 2
+
+    # Branches are mutually exclusive and checked in the same order as before
+    annular = asun > theta + aearth
+    clear = ~annular & ((theta > asun + aearth) | _isclose(asun + aearth, theta))
+    total = ~annular & ~clear & ((aearth > asun + theta) | _isclose(asun + theta, aearth))
+    partial = ~(annular | clear | total)
+
+    frac = np.zeros(satpos.shape[1], dtype=np.float64)
+    frac[annular] = earthsolid[annular] / sunsolid[annular]
+    frac[total] = 1.0
+
+    if partial.any():
+        asun_p = asun[partial]
+        aearth_p = aearth[partial]
+        theta_p = theta[partial]
+        ones = np.ones_like(theta_p)
+        zeros = np.zeros_like(theta_p)
+
+        a = (np.cos(aearth_p) - np.cos(asun_p) * np.cos(theta_p)) / np.sin(theta_p)
+        b = np.sqrt(np.maximum(np.sin(asun_p) ** 2 - a ** 2, 0.0))
+
+        p1 = np.array([zeros, zeros, ones])
+        p2 = np.array([np.sin(theta_p), zeros, np.cos(theta_p)])
+        p3 = np.array([a, -b, np.cos(asun_p)])
+        p4 = np.array([a, b, np.cos(asun_p)])
+
+        phi1 = _dihedral(p1, p4, p3)
+        phi2 = _dihedral(p2, p4, p3)
+        psi1 = _dihedral(p4, p1, p3)
+        psi2 = _dihedral(p4, p2, p3)
+
+        digon = np.where(
+            a < 0,
+            (2*np.pi - phi1)*(1 - np.cos(asun_p)) + phi1 + 2*psi1 - np.pi
+            + phi2*(1 - np.cos(aearth_p)) - (phi2 + 2*psi2 - np.pi),
+            2*np.pi - 2*(psi1 + psi2) - phi1*np.cos(asun_p) - phi2*np.cos(aearth_p),
+        )
+        frac[partial] = digon / sunsolid[partial]
+
+    return frac.astype(np.float32)
+
+
+def in_shadow(frac, threshold=SHADOW_THRESHOLD):
+    """Boolean "in shadow" mask for an array of eclipse fractions."""
+    return np.asarray(frac) > threshold
@@ -0,0 +1,48 @@
+import hashlib
+import os
+import numpy as np
+from resources import cache_folder, cached_array
+
+CACHE_DIR = cache_folder('ephemeris')
+# Samples evaluated per skyfield call while building a table
+BLOCK = 1_000_000
+
+_memory = {}
+
+
+def ephemeris_key(start, end, tdelta, size, ephemeris='de421.bsp'):
+    """Cache key for the Sun/Earth table of one time grid."""
+    text = '|'.join(str(v) for v in (
+        repr(start.tt), repr(end.tt), tdelta, size, os.path.basename(ephemeris)))
+    return f"sunearth-{hashlib.sha1(text.encode()).hexdigest()[:16]}"
+
+
+def sun_earth_table(eph, key, times, size, cache_dir=CACHE_DIR):
+    """
+    Barycentric Sun and Earth positions (AU) over a whole time grid.
+
+    Returns a read-only memory-mapped float64 array of shape (2, 3, N):
+    ``table[0]`` is ``sun.at(t).position.au`` and ``table[1]`` is
+    ``earth.at(t).position.au``.  ``times(lo, hi)`` returns the skyfield
+    Time of samples ``lo`` to ``hi`` of the ``size``-sample grid; it is only
+    called, block by block, when the table for ``key`` is not on disk yet,
+    so every orbit evaluated on the same grid skips the de421 lookups
+    entirely.
+    """
+    table = _memory.get(key)
+    if table is not None:
+        return table
+
+    def fill(out, lo, hi):
+        t = times(lo, hi)
+        out[0, :, lo:hi] = eph['sun'].at(t).position.au
+        out[1, :, lo:hi] = eph['earth'].at(t).position.au
+
+    table = cached_array(os.path.join(cache_dir, key + '.npy'), np.float64, (2, 3, size), fill, BLOCK)
+    _memory[key] = table
+    return table
+
+
+def clear_memory():
+    """Drop the in-process handles (the .npy files are left alone)."""
+    _memory.clear()
@@ -0,0 +1,101 @@
+import hashlib
+import os
+import numpy as np
+from skyfield.constants import DAY_S
+from skyfield.framelib import itrs
+from skyfield.sgp4lib import TEME
+from resources import cache_folder, cached_array
+
+CACHE_DIR = cache_folder('frames')
+# Samples evaluated per skyfield call while building a table; nutation
+# temporaries cost about 20 kB per sample, so keep this modest
+BLOCK = 20_000
+# WGS84 ellipsoid, as skyfield's wgs84.latlon_of uses
+WGS84_RADIUS_KM = 6378.137
+WGS84_E2 = 2/298.257223563 - (1/298.257223563)**2
+
+_memory = {}
+
+
+def frame_rotations(t):
+    """TEME→GCRS and GCRS→ITRS rotation matrices, each (3, 3, N), for a Time array."""
+    return np.swapaxes(TEME.rotation_at(t), 0, 1), itrs.rotation_at(t)
+
+
+def frames_key(start, end, tdelta, size):
+    """Cache key for the rotation table of one time grid."""
+    text = '|'.join(str(v) for v in (repr(start.tt), repr(end.tt), tdelta, size))
+    return f"frames-{hashlib.sha1(text.encode()).hexdigest()[:16]}"
+
+
+def frame_table(key, times, size, cache_dir=CACHE_DIR):
+    """
+    TEME→GCRS and GCRS→ITRS rotations over a whole time grid.
+
+    Returns a read-only memory-mapped float64 array of shape (2, 3, 3, N),
+    ``frame_rotations(t)`` stacked.  The precession, nutation and Earth
+    rotation behind these matrices depend only on time, so every orbit on
+    the same grid shares one table.  ``times(lo, hi)`` returns the skyfield
+    Time of samples ``lo`` to ``hi`` of the ``size``-sample grid; it is only
+    called on a miss, one block at a time.
+    """
+    table = _memory.get(key)
+    if table is not None:
+        return table
+
+    def fill(out, lo, hi):
+        out[0, ..., lo:hi], out[1, ..., lo:hi] = frame_rotations(times(lo, hi))
+
+    table = cached_array(os.path.join(cache_dir, key + '.npy'), np.float64, (2, 3, 3, size), fill, BLOCK)
+    _memory[key] = table
+    return table
+
+
+def clear_memory():
+    """Drop the in-process handles (the .npy files are left alone)."""
+    _memory.clear()
+
+
+def teme_positions(satrecs, t):
+    """(C, 3, N) TEME positions in km of every satellite in a SatrecArray."""
+    # SGP4 takes UTC Julian dates, split the same way EarthSatellite does
+    error, position, velocity = satrecs.sgp4(t.whole, t.tai_fraction - t._leap_seconds() / DAY_S)
+    return position.transpose(0, 2, 1)
+
+
+def teme_to_gcrs_itrs(teme_km, rotations):
+    """
+    GCRS and ITRS positions from TEME positions and a frame_table() slice.
+
+    ``teme_km`` is (3, N) or (C, 3, N); ``rotations`` is (2, 3, 3, N).
+    Returns two arrays shaped like ``teme_km``.
+    """
+    gcrs = np.einsum('ijn,...jn->...in', rotations[0], teme_km)
+    return gcrs, np.einsum('ijn,...jn->...in', rotations[1], gcrs)
+
+
+def itrs_to_gcrs(itrs_km, rotations):
+    """GCRS position of fixed (3,) ITRS coordinates (e.g. an observatory) at every sample."""
+    return np.einsum('jin,j->in', rotations[1], itrs_km)
+
+
+def radec(gcrs_km):
+    """RA and Dec (degrees) and distance (km) of (3, N) GCRS vectors, as ``.radec()``."""
+    x, y, z = gcrs_km
+    distance = np.sqrt(x*x + y*y + z*z)
+    ra = np.degrees(np.arctan2(y, x)) % 360.0
+    dec = np.degrees(np.arctan2(z, np.sqrt(x*x + y*y)))
+    return ra, dec, distance
+
+
+def geodetic_latlon(xyz_km):
+    """WGS84 latitude and longitude (degrees) of (3, ...) ITRS positions, as wgs84.latlon_of."""
+    x, y, z = xyz_km
+    R = np.sqrt(x*x + y*y)
+    lat = np.arctan2(z, R)
+    for iteration in 0, 1, 2:
+        sin_lat = np.sin(lat)
+        aC = WGS84_RADIUS_KM / np.sqrt(1.0 - WGS84_E2 * sin_lat * sin_lat)
+        lat = np.arctan2(z + aC * WGS84_E2 * sin_lat, R)
+    lon = (np.arctan2(y, x) - np.pi) % (2*np.pi) - np.pi
+    return np.degrees(lat), np.degrees(lon)
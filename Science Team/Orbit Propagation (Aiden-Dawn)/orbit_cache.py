@@ -0,0 +1,64 @@
+import hashlib
+import os
+from propagation_result import PropagationResult
+from resources import cache_folder, atomic_write
+
+CACHE_DIR = cache_folder('orbits')
+# Least recently used results are deleted once the directory grows past this
+MAX_BYTES = 2 * 1024**3
+# Bump when func() output changes so stale results stop matching
+VERSION = 2
+
+
+def orbit_key(kind, elements, settings, sites, topocentric=True, ephemeris='de421.bsp'):
+    """
+    Content address of one func() result.
+
+    Hashes the propagator ``kind``, its orbital-element arguments, every
+    field of the loaded ``settings`` (time window, step, epoch, drag terms,
+    observer, timezone...), the site names, whether observer-topocentric
+    arrays are kept and the ephemeris file.  Any change to these gives a
+    new key, so results never need invalidating by hand.
+    """
+    fields = sorted((k, repr(v.tt) if hasattr(v, 'tt') else repr(v)) for k, v in settings.as_dict().items())
+    text = '|'.join(str(v) for v in (
+        VERSION, kind, [repr(float(e)) for e in elements], fields, list(sites), topocentric,
+        os.path.basename(ephemeris)))
+    return f"{kind.lower()}-{hashlib.sha1(text.encode()).hexdigest()}"
+
+
+def load_result(key, cache_dir=CACHE_DIR):
+    """The cached PropagationResult for ``key``, or None on a miss."""
+    path = os.path.join(cache_dir, key + '.npz')
+    try:
+        result = PropagationResult.load(path)
+    except (FileNotFoundError, OSError, ValueError, KeyError):
+        return None
+    # mtime doubles as the last-used stamp for eviction
+    os.utime(path)
+    return result
+
+
+def store_result(key, result, cache_dir=CACHE_DIR, max_bytes=MAX_BYTES):
+    """Save ``result`` under ``key`` and evict old entries beyond ``max_bytes``."""
+    with atomic_write(os.path.join(cache_dir, key + '.npz')) as tmp:
+        result.save(tmp)
+    evict(cache_dir, max_bytes)
+
+
+def evict(cache_dir=CACHE_DIR, max_bytes=MAX_BYTES):
+    """Delete least recently used results until the cache fits in ``max_bytes``."""
+    entries = []
+    for entry in os.scandir(cache_dir):
+        if entry.name.endswith('.npz') and '.tmp' not in entry.name:
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    for mtime, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
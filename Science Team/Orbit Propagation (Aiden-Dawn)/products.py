@@ -0,0 +1,213 @@
+import json
+import os
+import numpy as np
+from sgp4.exporter import export_tle
+from propagation_result import PropagationResult
+from csv_stream import CSVStream
+from resources import atomic_write
+
+# Relative to the working directory, like the CSV outputs
+PRODUCTS_DIR = 'products'
+# Bump when the layout of the directory changes
+FORMAT_VERSION = 1
+# Chunks written between meta.json saves; a killed run loses at most these
+SAVE_EVERY = 16
+
+# Unit / frame of every PropagationResult array, recorded in meta.json
+UNITS = {
+    'time': 'UTC',
+    'sat_xyz': 'km, GCRS (X, Y, Z)',
+    'sat_latlon': 'deg, WGS84 (Lat, Lon)',
+    'eclipse': 'fraction of the Sun hidden by the Earth',
+    'site_alt': 'deg',
+    'site_az': 'deg',
+    'site_twilight': 'skyfield dark_twilight_day code',
+    'obs_xyz': 'km, GCRS (X, Y, Z)',
+    'ra': 'deg',
+    'dec': 'deg',
+    'az': 'deg',
+    'alt': 'deg',
+    'distance': 'km',
+}
+
+# CSV exports and the PropagationResult table each one holds
+CSV_EXPORTS = {
+    'satcoord.csv': PropagationResult.coord_frame,
+    'satlatlon.csv': PropagationResult.latlon_frame,
+    'satcoordxyz.csv': PropagationResult.satxyz_frame,
+    'obscordsxyz.csv': PropagationResult.obsxyz_frame,
+}
+
+
+def _save_meta(path, meta):
+    with atomic_write(os.path.join(path, 'meta.json')) as tmp, open(tmp, 'w') as file:
+        json.dump(meta, file, indent=4, default=str)
+
+
+def _load_meta(path):
+    with open(os.path.join(path, 'meta.json')) as file:
+        meta = json.load(file)
+    if meta['format'] != FORMAT_VERSION:
+        raise ValueError(f"{path} is products format {meta['format']}, expected {FORMAT_VERSION}")
+    return meta
+
+
+def run_metadata(parameters, sat, ephemeris='de421.bsp'):
+    """Settings, SGP4 elements / TLE and ephemeris of a propagation run, for ProductWriter."""
+    settings = parameters.as_dict()
+    settings['start'] = parameters.start.utc_iso()
+    settings['end'] = parameters.end.utc_iso()
+    elements = {name: getattr(sat, name) for name in (
+        'jdsatepoch', 'jdsatepochF', 'bstar', 'ecco', 'argpo', 'inclo', 'mo', 'no_kozai', 'nodeo')}
+    try:
+        tle = list(export_tle(sat))
+    except ValueError:
+        # TLEs cannot hold the inclinations past pi used for retrograde candidates
+        tle = None
+    return {'settings': settings, 'elements': elements, 'tle': tle, 'ephemeris': ephemeris}
+
+
+class ProductWriter:
+    """
+    Propagation output as a directory of typed, memory-mappable columns.
+
+    Every array of a PropagationResult becomes ``<path>/<name>.npy``,
+    preallocated for ``size`` samples and filled chunk by chunk with
+    write().  ``meta.json`` records the schema (dtype, shape and unit of
+    each column), the site names and timezone, the caller's ``metadata``
+    (see run_metadata()) and how many rows have been written.  It is saved
+    when the writer opens, every ``save_every`` chunks and when it closes
+    (also on an exception), so an interrupted run, even one killed outright,
+    still opens with the rows it finished up to the last save.
+    """
+
+    def __init__(self, path, size, sites, timezone, topocentric=True, metadata=None, save_every=SAVE_EVERY):
+        self.path = path
+        self.save_every = save_every
+        self._unsaved = 0
+        os.makedirs(path, exist_ok=True)
+        template = PropagationResult(0, sites, timezone, topocentric)
+        names = template.ARRAYS + (template.TOPOCENTRIC_ARRAYS if topocentric else ())
+
+        self.columns = {}
+        for name in names:
+            column = getattr(template, name)
+            shape = column.shape[:-1] + (size,)
+            self.columns[name] = np.lib.format.open_memmap(
+                os.path.join(path, name + '.npy'), mode='w+', dtype=column.dtype, shape=shape)
+
+        self.meta = {
+            'format': FORMAT_VERSION,
+            'size': size,
+            'rows': 0,
+            'complete': False,
+            'sites': list(sites),
+            'timezone': timezone,
+            'topocentric': topocentric,
+            'columns': {name: {'dtype': column.dtype.str, 'shape': list(column.shape), 'unit': UNITS[name]}
+                        for name, column in self.columns.items()},
+            'derived': {},
+            **(metadata or {}),
+        }
+        _save_meta(self.path, self.meta)
+
+    def write(self, result, rows):
+        """Store ``result`` (one chunk) at ``rows``, a slice of the full run."""
+        for name, column in self.columns.items():
+            column[..., rows] = getattr(result, name)
+        self.meta['rows'] = max(self.meta['rows'], rows.stop)
+        self._unsaved += 1
+        if self._unsaved >= self.save_every:
+            self.save()
+
+    def save(self):
+        """Flush the columns, then record the rows written so far in meta.json."""
+        # Columns reach the disk before meta.json counts their rows
+        for column in self.columns.values():
+            column.flush()
+        self.meta['complete'] = self.meta['rows'] == self.meta['size']
+        _save_meta(self.path, self.meta)
+        self._unsaved = 0
+
+    def close(self):
+        self.save()
+        self.columns.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_products(result, path=PRODUCTS_DIR, metadata=None):
+    """Save a whole PropagationResult in the ProductWriter layout."""
+    with ProductWriter(path, result.size, result.sites, result.timezone, result.topocentric, metadata) as writer:
+        writer.write(result, slice(0, result.size))
+
+
+def write_columns(columns, path=PRODUCTS_DIR):
+    """
+    Add per-sample columns derived from a run (e.g. flux_counts.py results).
+
+    ``columns`` maps a name to ``(array, unit)``; each array must have one
+    entry per written row.  They are saved next to the propagation columns
+    and listed under ``derived`` in meta.json, replacing earlier columns of
+    the same name, so open_products() serves them like any other column.
+    """
+    meta = _load_meta(path)
+    for name, (values, unit) in columns.items():
+        if name in meta['columns']:
+            raise ValueError(f"{name!r} is a propagation column")
+        values = np.asarray(values)
+        if values.shape[-1] != meta['rows']:
+            raise ValueError(f"{name!r} has {values.shape[-1]} rows, {path} has {meta['rows']}")
+        np.save(os.path.join(path, name + '.npy'), values)
+        meta['derived'][name] = {'dtype': values.dtype.str, 'shape': list(values.shape), 'unit': unit}
+    _save_meta(path, meta)
+
+
+def open_products(path=PRODUCTS_DIR, rows=None):
+    """
+    Memory-map a products directory as a read-only PropagationResult.
+
+    No data is read until a column is used, and only the rows used are
+    read.  ``rows`` (a slice) restricts every column to that range up
+    front.  Propagation columns are the usual attributes (``ra``,
+    ``sat_xyz``, ...); the ``columns`` attribute maps every column name,
+    derived ones included, to its view.  Only the rows written so far are
+    exposed, and ``meta.json`` is the ``metadata`` attribute.
+    """
+    meta = _load_meta(path)
+    columns = {}
+    for name in list(meta['columns']) + list(meta.get('derived', {})):
+        column = np.load(os.path.join(path, name + '.npy'), mmap_mode='r')[..., :meta['rows']]
+        columns[name] = column if rows is None else column[..., rows]
+
+    result = PropagationResult(0, meta['sites'], meta['timezone'], meta['topocentric'])
+    for name in meta['columns']:
+        setattr(result, name, columns[name])
+    result.size = len(result.time)
+    result.columns = columns
+    result.metadata = meta
+    return result
+
+
+def export_csv(path=PRODUCTS_DIR, outdir='.', shadow_mask=False, block=100_000):
+    """
+    Write the classic CSV tables (satcoord.csv, satlatlon.csv, satcoordxyz.csv,
+    obscordsxyz.csv and output/observation-parameters.csv) from a products
+    directory, ``block`` rows at a time.
+    """
+    result = open_products(path)
+    outputs = dict(CSV_EXPORTS) if result.topocentric else {'satlatlon.csv': PropagationResult.latlon_frame,
+                                                            'satcoordxyz.csv': PropagationResult.satxyz_frame}
+    outputs['output/observation-parameters.csv'] = lambda chunk: chunk.obs_frame(shadow_mask)
+    with CSVStream({os.path.join(outdir, name): frame for name, frame in outputs.items()}) as stream:
+        for lo in range(0, result.size, block):
+            stream.write(result.view(slice(lo, lo + block)))
+
+
+if __name__ == '__main__':
+    import sys
+    export_csv(*sys.argv[1:2])
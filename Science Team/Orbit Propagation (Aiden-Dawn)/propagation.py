@@ -0,0 +1,195 @@
+import numpy as np
+from sgp4.api import SatrecArray
+from skyfield.constants import AU_KM
+from settings import parameters
+from resources import timescale, ephemeris
+from eclipse import eclipse_fraction
+from propagation_result import PropagationResult, utc_datetime64
+from twilight_cache import twilight_codes, twilight_key
+from ephemeris_table import ephemeris_key, sun_earth_table
+from sites import OPTIMIZER_SITES, SiteArray
+from satellite import make_satrec
+from frames import frame_table, frames_key, teme_positions, teme_to_gcrs_itrs, itrs_to_gcrs, radec, geodetic_latlon
+from products import PRODUCTS_DIR, CSV_EXPORTS, ProductWriter, open_products, run_metadata
+from csv_stream import CSVStream
+from telemetry import stage
+
+
+def settings_satrec(config=parameters):
+    """SGP4 record of the orbit given in the settings themselves (inclo, ecco, nodeo, ...)."""
+    return make_satrec(config.inclo, config.ecco, config.nodeo, config=config)
+
+
+def grid_shape(config=parameters):
+    """(num_chunks, chunk_len) of the settings time window; the run has num_chunks*chunk_len samples."""
+    tscale = int((config.end - config.start) * 24 * 60 * 60 * 1000 + 1)
+    chunk_size = config.tdelta * config.chunks
+    return int(tscale/chunk_size), int(config.chunks)
+
+
+def grid_time(offsets, config=parameters):
+    """skyfield Time of the samples ``offsets`` milliseconds after the settings start."""
+    return timescale().utc(config.start.utc.year, \
+                           config.start.utc.month, \
+                           config.start.utc.day, \
+                           config.start.utc.hour, \
+                           config.start.utc.minute, \
+                           config.start.utc.second + offsets * 0.001)
+
+
+def grid_datetime64(config=parameters):
+    """UTC datetime64 stamps of every sample of the ``config`` time grid, as the chunks hold them."""
+    num_chunks, chunk_len = grid_shape(config)
+    return utc_datetime64(config.start, np.arange(num_chunks*chunk_len) * config.tdelta)
+
+
+def _block_times(config):
+    def grid(lo, hi):
+        # Samples lo to hi only, so the per-grid tables are built a block at a time
+        return grid_time(np.arange(lo, hi) * config.tdelta, config)
+    return grid
+
+
+def grid_twilight(sitearray, names, config=parameters):
+    """Twilight codes of each site in ``sitearray`` over the ``config`` time grid, cached under ``names``."""
+    eph = ephemeris()
+    num_chunks, chunk_len = grid_shape(config)
+    size = num_chunks*chunk_len
+    grid = _block_times(config)
+
+    # Twilight depends only on the site and the time grid, so it is cached across orbits
+    with stage('twilight'):
+        return [twilight_codes(eph, site, twilight_key(name, site, config.start, config.end, config.tdelta, size), grid, size)
+                for name, site in zip(names, sitearray.positions)]
+
+
+def grid_tables(sitearray, names, config=parameters):
+    """
+    The tables every orbit on the ``config`` time grid shares.
+
+    Returns ``(twilight, sunearth, frametable)``: grid_twilight(), the
+    Sun/Earth positions and the TEME→GCRS→ITRS rotations, each cached on
+    disk and built a block of samples at a time on a miss.
+    """
+    eph = ephemeris()
+    num_chunks, chunk_len = grid_shape(config)
+    size = num_chunks*chunk_len
+    grid = _block_times(config)
+    twilight = grid_twilight(sitearray, names, config)
+
+    # Sun/Earth positions are likewise shared by every orbit on this grid
+    with stage('sun/earth table'):
+        sunearth = sun_earth_table(eph, ephemeris_key(config.start, config.end, config.tdelta, size), grid, size)
+
+    # As are the TEME→GCRS→ITRS rotations, so no skyfield objects are built per chunk
+    with stage('frame table'):
+        frametable = frame_table(frames_key(config.start, config.end, config.tdelta, size), grid, size)
+
+    return twilight, sunearth, frametable
+
+
+def grid_chunks(config=parameters):
+    """
+    Yield ``(rows, t, times)`` for each chunk of the ``config`` time grid:
+    the slice of the full run, its skyfield Time and its UTC datetime64s.
+    """
+    num_chunks, chunk_len = grid_shape(config)
+    chunk_size = config.tdelta * config.chunks
+    for i in range(num_chunks):
+        with stage('time grid'):
+            offsets = np.arange(i*chunk_size, (i+1) * chunk_size, config.tdelta)
+            t = grid_time(offsets, config)
+            times = utc_datetime64(config.start, offsets)
+        yield slice(i*chunk_len, (i+1)*chunk_len), t, times
+
+
+def propagate_chunks(config=parameters, sat=None, sites=OPTIMIZER_SITES, names=None, topocentric=True):
+    """
+    Propagate one orbit over the ``config`` time window, a chunk at a time.
+
+    Yields ``(rows, chunk)``: the slice of the full run and a chunk-sized
+    PropagationResult holding those samples.  The same chunk is refilled
+    on every step, so copy what has to outlive it.  ``sat`` defaults to the
+    settings orbit, ``names`` relabels ``sites`` and ``topocentric`` adds
+    RA/Dec/alt/az/distance from the settings observer (lat, lon, elev).
+    """
+    sat = sat or settings_satrec(config)
+    # Raw SGP4 record; its TEME vectors are rotated with the cached frame table below
+    satrecs = SatrecArray([sat])
+
+    # Optimizer telescopes; alt/az for all of them comes from one batched rotation
+    sitearray = SiteArray(sites)
+    names = names or sitearray.names
+    if topocentric:
+        observer = SiteArray([{"name": "Observer", "latitude": config.lat,
+                               "longitude": config.lon, "elevation": config.elev}])
+
+    chunk = PropagationResult(grid_shape(config)[1], names, config.timezone, topocentric)
+    twilight, sunearth, frametable = grid_tables(sitearray, names, config)
+
+    for sl, t, times in grid_chunks(config):
+        chunk.time[:] = times
+
+        with stage('sgp4'):
+            teme = teme_positions(satrecs, t)[0]
+
+        with stage('frames'):
+            rotations = frametable[..., sl]
+            satgcrs, satitrs = teme_to_gcrs_itrs(teme, rotations)
+            chunk.sat_xyz[:] = satgcrs
+            chunk.sat_latlon[:] = geodetic_latlon(satitrs)
+
+        with stage('eclipse'):
+            sunpos = sunearth[0, :, sl]
+            earthpos = sunearth[1, :, sl]
+            chunk.eclipse[:] = eclipse_fraction(satgcrs / AU_KM, earthpos, sunpos)
+
+        with stage('frames'):
+            if topocentric:
+                obsgcrs = itrs_to_gcrs(observer.xyz[0], rotations)
+                chunk.obs_xyz[:] = obsgcrs
+                chunk.ra[:], chunk.dec[:], chunk.distance[:] = radec(satgcrs - obsgcrs)
+                alt, az = observer.altaz(satitrs)
+                chunk.alt[:], chunk.az[:] = alt[0], az[0]
+
+            sitealt, siteaz = sitearray.altaz(satitrs)
+            chunk.site_alt[:] = sitealt
+            chunk.site_az[:] = siteaz
+        for k, codes in enumerate(twilight):
+            chunk.site_twilight[k] = codes[sl]
+
+        yield sl, chunk
+
+
+def propagate(config=parameters, sat=None, sites=OPTIMIZER_SITES, names=None, topocentric=True):
+    """Whole-run PropagationResult in memory; arguments as propagate_chunks()."""
+    num_chunks, chunk_len = grid_shape(config)
+    result = PropagationResult(num_chunks*chunk_len, names or SiteArray(sites).names, config.timezone, topocentric)
+    for rows, chunk in propagate_chunks(config, sat, sites, names, topocentric):
+        for name in result.ARRAYS + (result.TOPOCENTRIC_ARRAYS if topocentric else ()):
+            getattr(result, name)[..., rows] = getattr(chunk, name)
+    return result
+
+
+def propagate_to_products(config=parameters, sat=None, path=PRODUCTS_DIR, csv=False, shadow_mask=False):
+    """
+    Stream a topocentric run into a products directory (see products.py).
+
+    Memory stays at one chunk whatever the window.  With ``csv`` the classic
+    CSV tables (satcoord.csv, ..., output/observation-parameters.csv) are
+    streamed alongside.  Returns the memory-mapped products.
+    """
+    sat = sat or settings_satrec(config)
+    num_chunks, chunk_len = grid_shape(config)
+    outputs = {}
+    if csv:
+        outputs = dict(CSV_EXPORTS)
+        outputs['output/observation-parameters.csv'] = lambda chunk: chunk.obs_frame(shadow_mask)
+
+    names = SiteArray(OPTIMIZER_SITES).names
+    with ProductWriter(path, num_chunks*chunk_len, names, config.timezone, metadata=run_metadata(config, sat)) as products, \
+         CSVStream(outputs) as stream:
+        for rows, chunk in propagate_chunks(config, sat):
+            products.write(chunk, rows)
+            stream.write(chunk)
+    return open_products(path)
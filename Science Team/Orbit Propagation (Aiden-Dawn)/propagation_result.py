@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+from eclipse import in_shadow
+
+
+def utc_datetime64(start, offsets_ms):
+    """UTC datetime64[us] stamps for a skyfield start Time plus millisecond offsets."""
+    t0 = pd.Timestamp(start.utc_datetime()).tz_convert(None).round('ms').to_datetime64()
+    return t0.astype('datetime64[us]') + np.rint(np.asarray(offsets_ms) * 1000).astype('timedelta64[us]')
+
+
+class PropagationResult:
+    """
+    Struct-of-arrays container filled in place by func(), one chunk at a time.
+
+    Positions are float64 (km), angles float32 (degrees), twilight codes int8
+    (skyfield ``dark_twilight_day``) and times datetime64[us] in UTC.  Per-site
+    arrays are shaped (len(sites), size) in the order given by ``sites``.
+    The *_frame() methods wrap these arrays in DataFrames without copying.
+    """
+
+    ARRAYS = ('time', 'sat_xyz', 'sat_latlon', 'eclipse', 'site_alt', 'site_az', 'site_twilight')
+    TOPOCENTRIC_ARRAYS = ('obs_xyz', 'ra', 'dec', 'az', 'alt', 'distance')
+
+    def __init__(self, size, sites, timezone, topocentric=True):
+        self.size = size
+        self.sites = list(sites)
+        self.timezone = timezone
+        self.topocentric = topocentric
+
+        self.time = np.zeros(size, 'datetime64[us]')
+        self.sat_xyz = np.zeros((3, size), np.float64)
+        self.sat_latlon = np.zeros((2, size), np.float32)
+        self.eclipse = np.zeros(size, np.float32)
+
+        self.site_alt = np.zeros((len(self.sites), size), np.float32)
+        self.site_az = np.zeros((len(self.sites), size), np.float32)
+        self.site_twilight = np.zeros((len(self.sites), size), np.int8)
+
+        # Observer (settings.json lat/lon) quantities; the optimizer skips them
+        if topocentric:
+            self.obs_xyz = np.zeros((3, size), np.float64)
+            self.ra = np.zeros(size, np.float32)
+            self.dec = np.zeros(size, np.float32)
+            self.az = np.zeros(size, np.float32)
+            self.alt = np.zeros(size, np.float32)
+            self.distance = np.zeros(size, np.float64)
+
+    def save(self, file):
+        """Write every array plus the site names and timezone to an uncompressed .npz."""
+        names = self.ARRAYS + (self.TOPOCENTRIC_ARRAYS if self.topocentric else ())
+        np.savez(file, sites=np.array(self.sites), timezone=np.array(self.timezone),
+                 **{name: getattr(self, name) for name in names})
+
+    @classmethod
+    def load(cls, file):
+        """Inverse of save()."""
+        with np.load(file) as data:
+            topocentric = 'ra' in data.files
+            result = cls(0, data['sites'].tolist(), str(data['timezone']), topocentric)
+            for name in cls.ARRAYS + (cls.TOPOCENTRIC_ARRAYS if topocentric else ()):
+                setattr(result, name, data[name])
+        result.size = len(result.time)
+        return result
+
+    def view(self, rows):
+        """A PropagationResult over ``rows`` (a slice) sharing this one's arrays."""
+        result = PropagationResult(0, self.sites, self.timezone, self.topocentric)
+        for name in self.ARRAYS + (self.TOPOCENTRIC_ARRAYS if self.topocentric else ()):
+            setattr(result, name, getattr(self, name)[..., rows])
+        result.size = len(result.time)
+        return result
+
+    def local_time(self):
+        """Times converted to the settings timezone (tz-aware, not object dtype)."""
+        return pd.DatetimeIndex(self.time).tz_localize('UTC').tz_convert(self.timezone)
+
+    def obs_frame(self, shadow_mask=False):
+        """Per-site Alt/Az/TIME table returned by TLEconstructor.func."""
+        columns = {'Time (EST)': self.local_time()}
+        for k, name in enumerate(self.sites):
+            columns[f'{name} Alt (Deg)'] = self.site_alt[k]
+            columns[f'{name} Az (Deg)'] = self.site_az[k]
+            columns[f'{name} TIME'] = self.site_twilight[k]
+        columns['Eclipse (Frac)'] = self.eclipse
+        if shadow_mask:
+            columns['In Shadow'] = in_shadow(self.eclipse)
+        return pd.DataFrame(columns, copy=False)
+
+    def coord_frame(self):
+        """Observer-topocentric table written to satcoord.csv."""
+        return pd.DataFrame({'Time (EST)': self.local_time(),
+                             'RA (Deg)': self.ra, 'Dec (Deg)': self.dec,
+                             'Az (Deg)': self.az, 'Alt (Deg)': self.alt,
+                             'Distance (Km)': self.distance,
+                             'Eclipse (Frac)': self.eclipse}, copy=False)
+
+    def latlon_frame(self):
+        return pd.DataFrame({'Lat': self.sat_latlon[0], 'Lon': self.sat_latlon[1]}, copy=False)
+
+    def satxyz_frame(self):
+        return pd.DataFrame({'X': self.sat_xyz[0], 'Y': self.sat_xyz[1], 'Z': self.sat_xyz[2]}, copy=False)
+
+    def obsxyz_frame(self):
+        return pd.DataFrame({'X': self.obs_xyz[0], 'Y': self.obs_xyz[1], 'Z': self.obs_xyz[2]}, copy=False)
@@ -1,12 +1,13 @@
 import numpy as np
 import matplotlib.pyplot as plt
+from products import open_products
 
 #rubindata = np.genfromtxt('satcoord-rubin.csv',delimiter=',',skip_header=1)
 #gmudata = np.genfromtxt('satcoord-gmu.csv',delimiter=',',skip_header=1)
 #palomardata = np.genfromtxt('satcoord-palomar.csv',delimiter=',',skip_header=1)
 #snifsdata = np.genfromtxt('satcoord-snifs.csv',delimiter=',',skip_header=1)
 #stardata = np.genfromtxt('exoplanet-host-stars.csv',delimiter=',',skip_header=9)
-data = np.genfromtxt('satcoord.csv',delimiter=',',skip_header=1)
+data = open_products() # memory-mapped STRAIGHTRUN output
 
 
 #rubin_ra = rubindata[:96,1]*(np.pi/180)
@@ -14,7 +15,7 @@ data = np.genfromtxt('satcoord.csv',delimiter=',',skip_header=1)
 #palomar_ra = palomardata[:96,1]*(np.pi/180)
 #snifs_ra = snifsdata[:96,1]*(np.pi/180)
 #star_ra = stardata[:,0]*(np.pi/180)
-ra = data[:50,1]*(np.pi/180)
+ra = data.ra[:50]*(np.pi/180)
 """
 for i in range(len(rubin_ra)):
     if rubin_ra[i] >= np.pi:
@@ -41,7 +42,7 @@ for i in range(len(ra)):
 #palomar_dec = palomardata[:96,2]*(np.pi/180)
 #snifs_dec = snifsdata[:96,2]*(np.pi/180)
 #star_dec = stardata[:,1]*(np.pi/180)
-dec = data[:50,2]*(np.pi/180)
+dec = data.dec[:50]*(np.pi/180)
 
 rubincountindex = []
 gmucountindex = []
@@ -0,0 +1,133 @@
+import gc
+import os
+from contextlib import contextmanager
+import numpy as np
+
+# Relative to the working directory, like the CSV outputs
+EPHEMERIS = 'de421.bsp'
+CACHE_ROOT = 'cache'
+
+_timescale = []
+_ephemerides = {}
+
+
+def timescale():
+    """The process-wide Skyfield timescale, built on first use."""
+    if not _timescale:
+        from skyfield.api import load
+        _timescale.append(load.timescale())
+    return _timescale[0]
+
+
+def ephemeris(name=EPHEMERIS):
+    """
+    The process-wide ephemeris ``name`` (a SpiceKernel), opened on first use.
+
+    Kernels are keyed by absolute path, so a different working directory
+    opens its own copy rather than returning a kernel for another file.
+    """
+    path = os.path.abspath(name)
+    eph = _ephemerides.get(path)
+    if eph is None:
+        from skyfield.api import load
+        eph = _ephemerides[path] = load(name)
+    return eph
+
+
+def preload(name=EPHEMERIS):
+    """
+    Load the timescale and ephemeris now.
+
+    Call it before starting a multiprocessing Pool so forked workers inherit
+    them, and pass it as (or from) the pool ``initializer`` so spawned
+    workers (Windows, macOS) load them once each rather than once per task.
+    """
+    timescale()
+    ephemeris(name)
+
+
+def clear():
+    """Forget the loaded objects (the ephemeris files are left open until collected)."""
+    _timescale.clear()
+    _ephemerides.clear()
+
+
+def cache_folder(name):
+    """Directory of the ``name`` cache (twilight, ephemeris, frames, orbits)."""
+    return os.path.join(CACHE_ROOT, name)
+
+
+@contextmanager
+def atomic_write(path):
+    """
+    Yield a temporary file name next to ``path`` to write to.
+
+    On success the file is renamed over ``path`` in one step, so a reader in
+    another process sees either no file or a whole one, never a partial
+    file; on an error it is deleted.  The name keeps ``path``'s extension,
+    so np.save / np.savez do not append another.
+    """
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp{os.path.splitext(path)[1]}"
+    try:
+        yield tmp
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def cached_array(path, dtype, shape, fill, block):
+    """
+    Read-only memory map of the .npy file ``path``, built first if missing.
+
+    On a miss a ``dtype`` array of ``shape`` is preallocated on disk and
+    ``fill(out, lo, hi)`` fills samples ``lo`` to ``hi`` of its last axis,
+    ``block`` samples per call, so building takes the same memory for any
+    number of samples.  The file appears through atomic_write().
+    """
+    if not os.path.exists(path):
+        with atomic_write(path) as tmp:
+            out = np.lib.format.open_memmap(tmp, mode='w+', dtype=dtype, shape=shape)
+            for lo in range(0, shape[-1], block):
+                fill(out, lo, min(lo + block, shape[-1]))
+                # skyfield's positions and Times hold reference cycles; free each block's now
+                gc.collect()
+            out.flush()
+            del out
+    return np.load(path, mmap_mode='r')
+
+
+def benchmark(calls=20, name=EPHEMERIS):
+    """
+    Seconds per call of loading the timescale and ephemeris afresh, as the
+    propagation functions used to on every call, against the memoized
+    timescale() / ephemeris().
+    """
+    import time
+    from skyfield.api import load
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        load.timescale()
+        load(name)
+    fresh = (time.perf_counter() - start) / calls
+
+    clear()
+    start = time.perf_counter()
+    for _ in range(calls):
+        timescale()
+        ephemeris(name)
+    shared = (time.perf_counter() - start) / calls
+    return fresh, shared
+
+
+if __name__ == '__main__':
+    import sys
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    fresh, shared = benchmark(calls)
+    print(f"load.timescale() + load({EPHEMERIS!r}): {fresh*1e3:.3f} ms per call")
+    print(f"resources.timescale() + ephemeris():  {shared*1e3:.3f} ms per call "
+          f"(first load included, {calls} calls)")
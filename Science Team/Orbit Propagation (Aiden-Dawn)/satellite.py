@@ -0,0 +1,32 @@
+from sgp4.api import Satrec, WGS72
+from settings import parameters
+
+
+def make_satrec(inc, eccen, nodeo, no_kozai=None, argpo=None, mo=None, config=parameters):
+    """
+    SGP4 record for one candidate orbit, initialised exactly as func() does.
+
+    Everything except inclination, eccentricity and RAAN (and optionally the
+    mean motion, argument of perigee and mean anomaly) comes from ``config``
+    (settings.json); a TLE in the settings overrides all.
+    """
+    sat = Satrec()
+    sat.sgp4init(
+        WGS72,           # gravity model
+        'i',             # 'a' = old AFSPC mode, 'i' = improved mode
+        1,               # satnum: Satellite number
+        config.epoch,               # epoch: days since 1949 December 31 00:00 UT
+        config.bstar,           # bstar: drag coefficient (/earth radii)
+        config.ndot,           # ndot: ballistic coefficient (radians/minute^2)
+        config.nddot,             # nddot: second derivative of mean motion (radians/minute^3)
+        eccen,             # ecco: eccentricity
+        config.argpo if argpo is None else argpo,  # argpo: argument of perigee (radians)
+        inc,               # inclo: inclination (radians)
+        config.mo if mo is None else mo,  # mo: mean anomaly (radians)
+        config.no_kozai if no_kozai is None else no_kozai,  # no_kozai: mean motion (radians/minute)
+        nodeo                # nodeo: right ascension of ascending node (radians)
+    )
+
+    if (config.tle1 != "NA" or config.tle2 != "NA"):
+        sat = Satrec.twoline2rv(config.tle1, config.tle2)
+    return sat
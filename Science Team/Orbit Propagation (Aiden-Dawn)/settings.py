@@ -1,16 +1,46 @@
 import json
 from datetime import datetime
 from pytz import timezone
-from skyfield.api import load
-ts = load.timescale()
 import re
 import os
 
 __location__ = os.path.realpath(os.path.join(os.getcwd(), os.path.dirname(__file__)))
 
 class Settings:
-    def __init__(self):
-        
+    """
+    Run parameters from settings.json, read on first use.
+
+    Importing this module (and so every script importing ``parameters``)
+    neither opens settings.json nor loads a Skyfield timescale; both happen
+    the first time a setting is read.  ``path`` selects another settings
+    file and keyword ``overrides`` replace its values, so notebooks and
+    batch runners can build configurations in-process.
+    """
+
+    def __init__(self, path=None, **overrides):
+        self._path = path or os.path.join(__location__, 'settings.json')
+        self._overrides = overrides
+        self._loaded = False
+
+    def __getattr__(self, name):
+        # Only called for attributes not set yet, i.e. before the first load
+        if name.startswith('_') or self._loaded:
+            raise AttributeError(name)
+        self._load()
+        return getattr(self, name)
+
+    def as_dict(self):
+        """Every setting by name (start/end as skyfield Times)."""
+        if not self._loaded:
+            self._load()
+        return {k: v for k, v in vars(self).items() if not k.startswith('_')}
+
+    def _load(self):
+        from resources import timescale
+        ts = timescale()
+        # Settings assigned before the first load win over the file
+        assigned = {k: v for k, v in vars(self).items() if not k.startswith('_')}
+
         d = {"epoch": 27577,
              "bstar": 0,
              "ndot": 0,
@@ -43,21 +73,22 @@ class Settings:
         for k, v in d.items():
             setattr(self, k, v) 
         
-        with open(os.path.join(__location__,'settings.json')) as f:
+        with open(self._path) as f:
             variables = json.load(f)
         for key, value in variables.items():
             if value is not None and value != "":
                 setattr(self, key, value)
+        for key, value in {**self._overrides, **assigned}.items():
+            setattr(self, key, value)
         
-        stimes = re.split("[-\s:]", self.start)
-        itimes = [int(i) for i in stimes]
-        time = datetime(itimes[0], itimes[1], itimes[2], itimes[3], itimes[4], itimes[5])
-        time = ts.from_datetime(timezone(self.timezone).localize(time))
-        setattr(self, "start", time)
-        stimes = re.split("[-\s:]", self.end)
-        itimes = [int(i) for i in stimes]
-        time = datetime(itimes[0], itimes[1], itimes[2], itimes[3], itimes[4], itimes[5])
-        time = ts.from_datetime(timezone(self.timezone).localize(time))
-        setattr(self, "end", time)
+        for name in ("start", "end"):
+            if not isinstance(getattr(self, name), str):
+                continue
+            stimes = re.split("[-\s:]", getattr(self, name))
+            itimes = [int(i) for i in stimes]
+            time = datetime(itimes[0], itimes[1], itimes[2], itimes[3], itimes[4], itimes[5])
+            time = ts.from_datetime(timezone(self.timezone).localize(time))
+            setattr(self, name, time)
+        self._loaded = True
 
 parameters = Settings()
\ No newline at end of file
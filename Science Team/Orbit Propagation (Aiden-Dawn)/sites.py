@@ -0,0 +1,61 @@
+import numpy as np
+from skyfield.api import wgs84
+
+# The four telescopes scored by the optimizer, in the column order func() uses
+OPTIMIZER_SITES = [
+    {"name": "Rubin", "latitude": -30, "longitude": -70.7493, "elevation": 2647},
+    {"name": "Mason", "latitude": 38.8282, "longitude": -77.3053, "elevation": 140},
+    {"name": "Palomar", "latitude": 33.1, "longitude": -116.8649, "elevation": 1872},
+    {"name": "SNIFS", "latitude": 19.82, "longitude": -155.4694, "elevation": 4245},
+]
+
+
+def site_positions(sites):
+    """wgs84 positions for a list of observatory dicts (elevation defaults to 0 m)."""
+    return [wgs84.latlon(s["latitude"], s["longitude"], s.get("elevation", 0)) for s in sites]
+
+
+class SiteArray:
+    """
+    N observatories evaluated together.
+
+    Takes the same list-of-dicts layout as ``observatories.py`` and
+    ``observatory_init.py`` ("name", "latitude", "longitude" and optionally
+    "elevation" in metres).  altaz() turns one satellite ITRS position block
+    into alt/az for every site with a single batched rotation, instead of a
+    separate ``(sat - site).at(t).altaz()`` pipeline per site.
+    """
+
+    def __init__(self, sites):
+        self.sites = list(sites)
+        self.names = [s["name"] for s in self.sites]
+        self.positions = site_positions(self.sites)
+
+        # Site ITRS positions (N, 3) in km
+        self.xyz = np.array([p.itrs_xyz.km for p in self.positions])
+
+        # Rows are the local east, north and up unit vectors in ITRS (N, 3, 3)
+        lat = np.radians([p.latitude.degrees for p in self.positions])
+        lon = np.radians([p.longitude.degrees for p in self.positions])
+        zero = np.zeros_like(lat)
+        self.enu = np.array([
+            [-np.sin(lon), np.cos(lon), zero],
+            [-np.sin(lat) * np.cos(lon), -np.sin(lat) * np.sin(lon), np.cos(lat)],
+            [np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)],
+        ]).transpose(2, 0, 1)
+
+    def __len__(self):
+        return len(self.sites)
+
+    def altaz(self, sat_itrs_km):
+        """
+        Altitude and azimuth (degrees) of the satellite from every site.
+
+        ``sat_itrs_km`` is the (3, T) geocentric ITRS position, e.g.
+        ``sat.at(t).frame_xyz(itrs).km``.  Returns two (N, T) arrays.
+        """
+        diff = sat_itrs_km[None, :, :] - self.xyz[:, :, None]
+        east, north, up = np.einsum('nij,njt->int', self.enu, diff)
+        alt = np.degrees(np.arctan2(up, np.hypot(east, north)))
+        az = np.degrees(np.arctan2(east, north)) % 360.0
+        return alt, az
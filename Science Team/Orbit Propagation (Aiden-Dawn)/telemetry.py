@@ -0,0 +1,158 @@
+import csv
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+# stage name -> [seconds, calls], accumulated by stage() in this process
+_stages = {}
+
+
+@contextmanager
+def stage(name):
+    """Add the time spent in the ``with`` block to stage ``name``."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        entry = _stages.setdefault(name, [0.0, 0])
+        entry[0] += time.perf_counter() - start
+        entry[1] += 1
+
+
+def snapshot():
+    """Stage totals so far, {name: (seconds, calls)}."""
+    return {name: tuple(entry) for name, entry in _stages.items()}
+
+
+def since(before):
+    """Stage totals added after ``before`` (a snapshot()), e.g. by one pool task."""
+    added = {}
+    for name, (seconds, calls) in snapshot().items():
+        seconds0, calls0 = before.get(name, (0.0, 0))
+        if calls != calls0:
+            added[name] = (seconds - seconds0, calls - calls0)
+    return added
+
+
+def merge(stages):
+    """Add stage totals measured in another process (see since())."""
+    for name, (seconds, calls) in stages.items():
+        entry = _stages.setdefault(name, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += calls
+
+
+def reset():
+    """Forget every stage total."""
+    _stages.clear()
+
+
+def profile(orbits=None, wall=None):
+    """
+    Stage totals as a report dict.
+
+    ``stages`` lists every stage, slowest first, with its seconds, calls,
+    mean milliseconds per call and share of the summed stage time.  With
+    ``orbits`` (evaluated) and ``wall`` (elapsed seconds) it adds orbits per
+    second, milliseconds per orbit and the time spent outside every stage.
+    Stage times from pool workers overlap, so with several workers they can
+    add up to more than ``wall``.
+    """
+    total = sum(seconds for seconds, calls in _stages.values())
+    report = {
+        'stages': [dict(stage=name, seconds=seconds, calls=calls,
+                        mean_ms=seconds / calls * 1e3 if calls else 0.0,
+                        share=seconds / total if total else 0.0)
+                   for name, (seconds, calls) in sorted(_stages.items(), key=lambda kv: -kv[1][0])],
+        'stage_seconds': total,
+    }
+    if wall is not None:
+        report['wall_seconds'] = wall
+        # Time outside every stage, e.g. scoring loops that are not instrumented
+        report['unstaged_seconds'] = max(wall - total, 0.0)
+    if orbits is not None:
+        report['orbits'] = orbits
+        if wall:
+            report['orbits_per_second'] = orbits / wall
+            report['ms_per_orbit'] = wall / orbits * 1e3 if orbits else 0.0
+    return report
+
+
+def write_profile(path, orbits=None, wall=None):
+    """
+    Save profile() to ``path``: JSON, or one CSV row per stage when the name
+    ends in .csv (the throughput figures then go in a trailing 'total' row).
+    """
+    report = profile(orbits, wall)
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    if not path.endswith('.csv'):
+        with open(path, 'w') as file:
+            json.dump(report, file, indent=4)
+        return report
+
+    fields = ['stage', 'seconds', 'calls', 'mean_ms', 'share', 'orbits', 'orbits_per_second', 'ms_per_orbit']
+    with open(path, 'w', newline='') as file:
+        writer = csv.DictWriter(file, fields, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(report['stages'])
+        writer.writerow(dict(stage='total', seconds=report.get('wall_seconds', report['stage_seconds']),
+                             orbits=report.get('orbits'), orbits_per_second=report.get('orbits_per_second'),
+                             ms_per_orbit=report.get('ms_per_orbit')))
+    return report
+
+
+def _clock(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+class Progress:
+    """
+    Live progress line: done / total, percentage, rate and ETA.
+
+    Call update() once per finished orbit (or with ``n``); the line is
+    redrawn in place at most every ``interval`` seconds and after the last
+    orbit.  ``note`` is appended, e.g. the best quality so far.  With
+    ``enabled`` False nothing is printed, but the counts are still kept.
+    """
+
+    def __init__(self, total, unit='orbits', interval=0.5, enabled=True, stream=None):
+        self.total = total
+        self.unit = unit
+        self.interval = interval
+        self.enabled = enabled
+        self.stream = stream or sys.stdout
+        self.done = 0
+        self.start = time.perf_counter()
+        self._shown = -float('inf')
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    @property
+    def rate(self):
+        """Orbits per second so far."""
+        elapsed = self.elapsed
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    def update(self, n=1, note=''):
+        self.done += n
+        now = time.perf_counter()
+        if not self.enabled or (now - self._shown < self.interval and self.done < self.total):
+            return
+        self._shown = now
+        rate = self.rate
+        eta = _clock((self.total - self.done) / rate) if rate and self.total else '?'
+        pct = self.done / self.total * 100 if self.total else 100.0
+        line = f"\r{pct:5.1f}%  {self.done}/{self.total}  {rate:.2f} {self.unit}/s  ETA {eta}"
+        print(line + (f"  {note}" if note else ''), end='', file=self.stream, flush=True)
+
+    def close(self):
+        """End the progress line."""
+        if self.enabled:
+            print(file=self.stream)
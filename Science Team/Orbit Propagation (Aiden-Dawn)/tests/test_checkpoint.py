@@ -0,0 +1,63 @@
+import os
+import numpy as np
+import pytest
+from checkpoint import Checkpoint
+
+SHAPE = (10, 12)
+
+
+def cell(index):
+    # Stand-in for one swept cell's result row
+    return np.arange(SHAPE[1]) + 100.0 * index
+
+
+def sweep(checkpoint, stop=None):
+    """Record the pending cells in order, as runbaby.py does, up to ``stop`` of them."""
+    for n, index in enumerate(np.flatnonzero(~checkpoint.done)):
+        if n == stop:
+            return
+        checkpoint.record(index, cell(index))
+
+
+def test_resume_matches_uninterrupted(tmp_path):
+    path = str(tmp_path / "sweep.npy")
+    expected = np.array([cell(k) for k in range(SHAPE[0])])
+
+    checkpoint = Checkpoint(path, SHAPE)
+    assert checkpoint.completed() == 0
+    sweep(checkpoint, stop=4)
+    del checkpoint   # the run dies here
+
+    checkpoint = Checkpoint(path, SHAPE)
+    assert checkpoint.completed() == 4
+    assert np.flatnonzero(checkpoint.done).tolist() == [0, 1, 2, 3]
+    sweep(checkpoint)
+    assert checkpoint.completed() == SHAPE[0]
+    rows = checkpoint.finish()
+
+    np.testing.assert_array_equal(rows, expected)
+    np.testing.assert_array_equal(np.load(path), expected)
+    assert sorted(os.listdir(tmp_path)) == ["sweep.npy"]
+
+
+def test_unflagged_row_is_recomputed(tmp_path):
+    path = str(tmp_path / "sweep.npy")
+    checkpoint = Checkpoint(path, SHAPE)
+    sweep(checkpoint, stop=2)
+    # Killed after writing row 2 but before flagging it
+    checkpoint.rows[2] = -1
+    checkpoint.rows.flush()
+    del checkpoint
+
+    checkpoint = Checkpoint(path, SHAPE)
+    assert checkpoint.completed() == 2
+    assert np.flatnonzero(~checkpoint.done)[0] == 2
+    sweep(checkpoint)
+    np.testing.assert_array_equal(checkpoint.finish()[2], cell(2))
+
+
+def test_shape_mismatch(tmp_path):
+    path = str(tmp_path / "sweep.npy")
+    sweep(Checkpoint(path, SHAPE), stop=3)
+    with pytest.raises(ValueError, match="delete it to start over"):
+        Checkpoint(path, (SHAPE[0] + 1, SHAPE[1]))
@@ -0,0 +1,98 @@
+import math
+import numpy as np
+from eclipse import SUN_RADIUS_AU, EARTH_RADIUS_AU, eclipse_fraction, in_shadow
+
+GEO_AU = 42164 / 149597870.7
+
+
+def baseline_eclipse(satpos, earthpos, sunpos):
+    # The per-sample helper eclipse_fraction() replaced, as TLEconstructor.py had it
+    satpos = satpos + earthpos
+    satsun = sunpos - satpos
+    satearth = earthpos - satpos
+    satsundist = np.linalg.norm(satsun)
+    satearthdist = np.linalg.norm(satearth)
+
+    asun = math.atan(0.00465047/satsundist)
+    aearth = math.atan(4.26354e-5/satearthdist)
+    theta = math.acos(np.vdot(satsun, satearth)/(satearthdist * satsundist))
+    sunsolid = math.pi * asun ** 2
+    earthsolid = math.pi * aearth ** 2
+
+    if (asun > theta + aearth):
+        return str(round(earthsolid/sunsolid * 100)) + "%"
+    elif (theta > asun + aearth or math.isclose(asun + aearth, theta)):
+        return "0%"
+    elif (aearth > asun + theta or math.isclose(asun + theta, aearth)):
+        return "100%"
+    else:
+        a = (math.cos(aearth) - (math.cos(asun)*math.cos(theta)))/math.sin(theta)
+        b = (math.sin(asun)**2 - a**2)**0.5
+
+        p1 = np.array([0, 0, 1])
+        p2 = np.array([math.sin(theta), 0, math.cos(theta)])
+        p3 = np.array([a, -b, math.cos(asun)])
+        p4 = np.array([a, b, math.cos(asun)])
+
+        nb = np.cross(p1, p4 - p1)/np.linalg.norm(np.cross(p1, p4 - p1))
+        nc = np.cross(p1, p3 - p1)/np.linalg.norm(np.cross(p1, p3 - p1))
+        phi1 = math.acos(np.vdot(nb, nc))
+        nb = np.cross(p2, p4 - p2)/np.linalg.norm(np.cross(p2, p4 - p2))
+        nc = np.cross(p2, p3 - p2)/np.linalg.norm(np.cross(p2, p3 - p2))
+        phi2 = math.acos(np.vdot(nb, nc))
+        nb = np.cross(p4, p1 - p4)/np.linalg.norm(np.cross(p4, p1 - p4))
+        nc = np.cross(p4, p3 - p4)/np.linalg.norm(np.cross(p4, p3 - p4))
+        psi1 = math.acos(np.vdot(nb, nc))
+        nb = np.cross(p4, p2 - p4)/np.linalg.norm(np.cross(p4, p2 - p4))
+        nc = np.cross(p4, p3 - p4)/np.linalg.norm(np.cross(p4, p3 - p4))
+        psi2 = math.acos(np.vdot(nb, nc))
+
+        if (a < 0):
+            digon = (2*math.pi-phi1)*(1-math.cos(asun)) + phi1 +2*psi1 - math.pi + phi2*(1-math.cos(aearth)) - (phi2+2*psi2-math.pi)
+        else:
+            digon = 2*math.pi - 2*(psi1 + psi2) - phi1 * math.cos(asun) - phi2 * math.cos(aearth)
+
+        return str(round(digon/sunsolid * 100)) + "%"
+
+
+def geometry():
+    """
+    (3, N) geocentric satellite, barycentric Earth and Sun positions (AU)
+    crossing the edge of the Earth's shadow at GEO distance, plus a few far
+    points on the anti-Sun axis where the Earth covers less than the Sun.
+    """
+    earth = np.array([-0.2, 0.9, 0.05])
+    sun = earth + np.array([1.0, 0.0, 0.0])
+    aearth = math.atan(EARTH_RADIUS_AU / GEO_AU)
+    asun = math.atan(SUN_RADIUS_AU / 1.0)
+    # Angle between the Earth's centre and the Sun's, seen from the satellite
+    theta = np.linspace(aearth - 3*asun, aearth + 3*asun, 401)
+    sat = GEO_AU * np.array([-np.cos(theta), np.sin(theta), 0.01*np.ones_like(theta)])
+    far = np.array([[-0.02, -0.05, -0.1], [1e-5, 0.0, -1e-5], [0.0, 0.0, 0.0]])
+    sat = np.hstack([sat, far])
+    return sat, np.repeat(earth[:, None], sat.shape[1], 1), np.repeat(sun[:, None], sat.shape[1], 1)
+
+
+def test_matches_per_sample_baseline():
+    sat, earth, sun = geometry()
+    frac = eclipse_fraction(sat, earth, sun)
+    expected = [baseline_eclipse(sat[:, j], earth[:, j], sun[:, j]) for j in range(sat.shape[1])]
+
+    assert frac.dtype == np.float32
+    assert [f"{round(float(f) * 100)}%" for f in frac] == expected
+    # Every branch is exercised: clear, total, partial and annular
+    assert "0%" in expected and "100%" in expected
+    assert np.any((frac > 0.01) & (frac < 0.99))
+    assert np.all((frac[-3:] > 0) & (frac[-3:] < 1))
+
+
+def test_in_shadow_matches_nonzero_labels():
+    sat, earth, sun = geometry()
+    expected = [baseline_eclipse(sat[:, j], earth[:, j], sun[:, j]) != "0%" for j in range(sat.shape[1])]
+    assert in_shadow(eclipse_fraction(sat, earth, sun)).tolist() == expected
+
+
+def test_bounded_fraction():
+    sat, earth, sun = geometry()
+    frac = eclipse_fraction(sat, earth, sun)
+    assert np.all((frac >= 0) & (frac <= 1))
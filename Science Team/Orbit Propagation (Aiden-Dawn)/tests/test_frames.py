@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+from sgp4.api import Satrec, SatrecArray, WGS72
+from skyfield.api import EarthSatellite, wgs84
+from skyfield.framelib import itrs
+import frames
+from frames import frame_table, teme_positions, teme_to_gcrs_itrs, itrs_to_gcrs, radec, geodetic_latlon
+from resources import timescale
+from sites import OPTIMIZER_SITES, SiteArray
+
+ARCSEC = 1 / 3600
+# Sites of the optimizer plus a far-southern and an eastern-hemisphere one
+SITES = OPTIMIZER_SITES + [
+    {"name": "South Pole", "latitude": -89.99, "longitude": 139.27, "elevation": 2835},
+    {"name": "Siding Spring", "latitude": -31.2733, "longitude": 149.0617, "elevation": 1165},
+]
+# (inclination, eccentricity, mean motion in rad/min): LEO, GEO, Molniya-like
+ORBITS = [(0.9, 0.001, 0.06), (0.001, 0, 0.00437519126), (1.1, 0.7, 0.0087)]
+# (epoch in days since 1949 December 31, grid start); the optimizer's year and two others
+EPOCHS = [(28856, (2029, 1, 1)), (27000, (2023, 12, 3)), (18262, (2000, 1, 1))]
+DAYS = 3
+STEP_MIN = 5
+
+
+def separation(lon1, lat1, lon2, lat2):
+    """Angle (degrees) between directions given as longitude/latitude pairs in degrees."""
+    def unit(lon, lat):
+        lon, lat = np.radians(lon), np.radians(lat)
+        return np.array([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+    a, b = unit(lon1, lat1), unit(lon2, lat2)
+    return np.degrees(np.arctan2(np.linalg.norm(np.cross(a, b, axis=0), axis=0), np.sum(a * b, axis=0)))
+
+
+@pytest.fixture(scope="module", params=EPOCHS, ids=lambda e: f"{e[1][0]}")
+def grid(request, tmp_path_factory):
+    """A multi-day grid and its frame_table(), built a few blocks at a time as propagate() does."""
+    epoch, start = request.param
+    ts = timescale()
+    size = DAYS * 1440 // STEP_MIN
+
+    def times(lo, hi):
+        return ts.utc(*start, 0, np.arange(lo, hi) * STEP_MIN)
+
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(frames, "BLOCK", 200)
+        table = frame_table(f"test-{epoch}", times, size, str(tmp_path_factory.mktemp("frames")))
+    return epoch, times(0, size), table
+
+
+@pytest.fixture(params=ORBITS, ids=["leo", "geo", "molniya"])
+def orbit(request, grid):
+    epoch, t, table = grid
+    inc, ecco, no_kozai = request.param
+    satrec = Satrec()
+    satrec.sgp4init(WGS72, 'i', 1, epoch, 0, 0, 0, ecco, 0.5, inc, 0.3, no_kozai, 1.0)
+    gcrs, xyz_itrs = teme_to_gcrs_itrs(teme_positions(SatrecArray([satrec]), t)[0], table)
+    return EarthSatellite.from_satrec(satrec, timescale()), t, table, gcrs, xyz_itrs
+
+
+def test_gcrs_itrs_and_latlon(orbit):
+    sat, t, table, gcrs, xyz_itrs = orbit
+    position = sat.at(t)
+    np.testing.assert_allclose(gcrs, position.position.km, rtol=0, atol=1e-6)
+    np.testing.assert_allclose(xyz_itrs, position.frame_xyz(itrs).km, rtol=0, atol=1e-6)
+
+    lat, lon = geodetic_latlon(xyz_itrs)
+    expected_lat, expected_lon = wgs84.latlon_of(position)
+    assert separation(lon, lat, expected_lon.degrees, expected_lat.degrees).max() < ARCSEC
+
+
+def test_site_altaz_and_radec(orbit):
+    sat, t, table, gcrs, xyz_itrs = orbit
+    sitearray = SiteArray(SITES)
+    alt, az = sitearray.altaz(xyz_itrs)
+    for k, site in enumerate(sitearray.positions):
+        topocentric = (sat - site).at(t)
+        expected_alt, expected_az, expected_distance = topocentric.altaz()
+        assert separation(az[k], alt[k], expected_az.degrees, expected_alt.degrees).max() < ARCSEC, sitearray.names[k]
+
+        ra, dec, distance = radec(gcrs - itrs_to_gcrs(sitearray.xyz[k], table))
+        expected_ra, expected_dec, _ = topocentric.radec()
+        assert separation(ra, dec, expected_ra._degrees, expected_dec.degrees).max() < ARCSEC, sitearray.names[k]
+        np.testing.assert_allclose(distance, expected_distance.km, rtol=0, atol=1e-6)
+
+
+def test_float32_columns_stay_sub_arcsecond(orbit):
+    # PropagationResult keeps angles as float32; the rounding must not spend the budget
+    sat, t, table, gcrs, xyz_itrs = orbit
+    sitearray = SiteArray(SITES)
+    alt, az = sitearray.altaz(xyz_itrs)
+    assert separation(az.astype(np.float32), alt.astype(np.float32), az, alt).max() < ARCSEC
@@ -0,0 +1,127 @@
+import json
+import os
+import numpy as np
+import pytest
+from propagation_result import PropagationResult
+from products import ProductWriter, write_products, write_columns, open_products
+
+SITES = ["Rubin", "Mason", "Palomar", "SNIFS"]
+TIMEZONE = "US/Eastern"
+
+
+def random_result(size=50, topocentric=True, seed=0):
+    """A PropagationResult with every array filled with distinct values."""
+    rng = np.random.default_rng(seed)
+    result = PropagationResult(size, SITES, TIMEZONE, topocentric)
+    result.time[:] = np.datetime64("2029-01-01T00:00") + np.arange(size) * np.timedelta64(60, "s")
+    for name in result.ARRAYS[1:] + (result.TOPOCENTRIC_ARRAYS if topocentric else ()):
+        column = getattr(result, name)
+        column[...] = (rng.integers(0, 5, column.shape) if column.dtype == np.int8
+                       else rng.normal(size=column.shape) * 1e3)
+    return result
+
+
+def assert_same(actual, expected, rows=slice(None)):
+    names = expected.ARRAYS + (expected.TOPOCENTRIC_ARRAYS if expected.topocentric else ())
+    assert actual.sites == expected.sites
+    assert actual.timezone == expected.timezone
+    assert actual.topocentric == expected.topocentric
+    for name in names:
+        column = getattr(actual, name)
+        assert column.dtype == getattr(expected, name).dtype, name
+        np.testing.assert_array_equal(column, getattr(expected, name)[..., rows], err_msg=name)
+
+
+@pytest.mark.parametrize("topocentric", [True, False])
+def test_round_trip_matches_npz(tmp_path, topocentric):
+    result = random_result(topocentric=topocentric)
+    write_products(result, str(tmp_path / "products"), {"run": "test"})
+    result.save(str(tmp_path / "result.npz"))
+
+    products = open_products(str(tmp_path / "products"))
+    assert products.size == result.size
+    assert products.metadata["run"] == "test"
+    assert products.metadata["rows"] == products.metadata["size"] == result.size
+    assert products.metadata["complete"]
+    assert_same(products, result)
+    # The .npz layout is the reference the columns must agree with
+    assert_same(products, PropagationResult.load(str(tmp_path / "result.npz")))
+
+
+def test_chunked_writer_and_rows(tmp_path):
+    result = random_result()
+    path = str(tmp_path / "products")
+    with ProductWriter(path, result.size, SITES, TIMEZONE) as writer:
+        for lo in range(0, result.size, 16):
+            rows = slice(lo, min(lo + 16, result.size))
+            writer.write(result.view(rows), rows)
+
+    assert_same(open_products(path), result)
+    assert_same(open_products(path, rows=slice(10, 30)), result, slice(10, 30))
+
+
+def test_interrupted_writer_keeps_finished_rows(tmp_path):
+    result = random_result()
+    path = str(tmp_path / "products")
+    with pytest.raises(KeyboardInterrupt):
+        with ProductWriter(path, result.size, SITES, TIMEZONE) as writer:
+            writer.write(result.view(slice(0, 20)), slice(0, 20))
+            raise KeyboardInterrupt
+
+    products = open_products(path)
+    assert products.size == 20
+    assert not products.metadata["complete"]
+    assert_same(products, result, slice(0, 20))
+
+
+def test_killed_writer_keeps_saved_rows(tmp_path):
+    # write() without close(), as after SIGKILL or a power loss
+    result = random_result()
+    path = str(tmp_path / "products")
+    writer = ProductWriter(path, result.size, SITES, TIMEZONE, save_every=2)
+    for lo in range(0, 40, 10):
+        writer.write(result.view(slice(lo, lo + 10)), slice(lo, lo + 10))
+    writer.write(result.view(slice(40, 50)), slice(40, 50))
+
+    products = open_products(path)
+    assert products.size == 40
+    assert not products.metadata["complete"]
+    assert_same(products, result, slice(0, 40))
+
+
+@pytest.mark.parametrize("save_every, expected", [(1, [0, 10, 20, 30, 40, 50, 50]),
+                                                  (2, [0, 20, 40, 50]),
+                                                  (16, [0, 50])])
+def test_meta_saved_every_few_chunks(tmp_path, monkeypatch, save_every, expected):
+    import products
+    saves = []
+    save_meta = products._save_meta
+
+    def counting_save_meta(path, meta):
+        saves.append(meta["rows"])
+        save_meta(path, meta)
+    monkeypatch.setattr(products, "_save_meta", counting_save_meta)
+
+    result = random_result()
+    with ProductWriter(str(tmp_path / "products"), result.size, SITES, TIMEZONE, save_every=save_every) as writer:
+        for lo in range(0, result.size, 10):
+            writer.write(result.view(slice(lo, lo + 10)), slice(lo, lo + 10))
+    assert saves == expected
+
+
+def test_write_columns(tmp_path):
+    result = random_result()
+    path = str(tmp_path / "products")
+    write_products(result, path)
+    counts = np.arange(result.size, dtype=np.float32)
+    write_columns({"flux": (counts, "photons / s")}, path)
+
+    products = open_products(path, rows=slice(5, 15))
+    np.testing.assert_array_equal(products.columns["flux"], counts[5:15])
+    with open(os.path.join(path, "meta.json")) as file:
+        assert json.load(file)["derived"]["flux"]["unit"] == "photons / s"
+
+    with pytest.raises(ValueError, match="propagation column"):
+        write_columns({"eclipse": (counts, "fraction")}, path)
+    with pytest.raises(ValueError, match="rows"):
+        write_columns({"short": (counts[:-1], "photons / s")}, path)
@@ -0,0 +1,40 @@
+import os
+import numpy as np
+import pytest
+from resources import atomic_write, cached_array
+
+
+def test_cached_array_fills_every_block_once(tmp_path):
+    path = str(tmp_path / "cache" / "table.npy")
+    calls = []
+
+    def fill(out, lo, hi):
+        calls.append((lo, hi))
+        out[:, lo:hi] = np.arange(lo, hi)
+
+    table = cached_array(path, np.float64, (2, 10), fill, 4)
+    assert calls == [(0, 4), (4, 8), (8, 10)]
+    np.testing.assert_array_equal(table, np.tile(np.arange(10.0), (2, 1)))
+    assert not table.flags.writeable
+
+    # A hit only maps the file
+    np.testing.assert_array_equal(cached_array(path, np.float64, (2, 10), fill, 4), table)
+    assert len(calls) == 3
+    assert os.listdir(tmp_path / "cache") == ["table.npy"]
+
+
+def test_failed_write_leaves_nothing(tmp_path):
+    path = str(tmp_path / "table.npy")
+
+    def fill(out, lo, hi):
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        cached_array(path, np.int8, (10,), fill, 4)
+    assert os.listdir(tmp_path) == []
+
+    with pytest.raises(ValueError):
+        with atomic_write(path) as tmp:
+            np.save(tmp, np.zeros(3))
+            raise ValueError
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,54 @@
+import hashlib
+import os
+import numpy as np
+from skyfield import almanac
+from resources import cache_folder, cached_array
+
+CACHE_DIR = cache_folder('twilight')
+# Samples evaluated per almanac call on a miss; the search behind
+# dark_twilight_day costs about 2 kB per sample
+BLOCK = 20_000
+
+_memory = {}
+
+
+def twilight_key(name, site, start, end, tdelta, size, ephemeris='de421.bsp'):
+    """
+    Cache key for one site over one time grid.
+
+    The twilight codes depend only on the site and the time grid (start, end,
+    tdelta and number of samples) and on the ephemeris, never on the orbit.
+    """
+    text = '|'.join(str(v) for v in (
+        name, site.latitude.degrees, site.longitude.degrees, site.elevation.m,
+        repr(start.tt), repr(end.tt), tdelta, size, os.path.basename(ephemeris)))
+    return f"{name.lower()}-{hashlib.sha1(text.encode()).hexdigest()[:16]}"
+
+
+def twilight_codes(eph, site, key, times, size, cache_dir=CACHE_DIR):
+    """
+    int8 ``almanac.dark_twilight_day`` codes for ``site``, cached by ``key``.
+
+    ``times(lo, hi)`` returns the skyfield Time of samples ``lo`` to ``hi``
+    of the ``size``-sample grid; it is only called on a miss, one block at a
+    time, so building the codes takes the same memory for any window.
+    Results are kept in memory (memory-mapped) for the life of the process
+    and in ``cache_dir/<key>.npy`` across runs.
+    """
+    codes = _memory.get(key)
+    if codes is not None:
+        return codes
+
+    twilight = almanac.dark_twilight_day(eph, site)
+
+    def fill(out, lo, hi):
+        out[lo:hi] = twilight(times(lo, hi))
+
+    codes = cached_array(os.path.join(cache_dir, key + '.npy'), np.int8, (size,), fill, BLOCK)
+    _memory[key] = codes
+    return codes
+
+
+def clear_memory():
+    """Drop the in-process copies (the .npy files are left alone)."""
+    _memory.clear()
@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+from settings import parameters
+from adaptive import propagate_adaptive
+from sites import OPTIMIZER_SITES
+
+
+def _runs(mask):
+    """(first, last + 1) index pairs of each run of True in a boolean array."""
+    edges = np.diff(np.concatenate([[0], np.asarray(mask, dtype=np.int8), [0]]))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def intersect(a, b):
+    """
+    Intersection of two sorted, non-overlapping interval lists.
+
+    ``a`` and ``b`` are (N, 2) arrays of [start, end) pairs (any ordered
+    dtype, e.g. datetime64 or float days); returns the same layout.
+    """
+    a, b = np.asarray(a), np.asarray(b)
+    out = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        lo, hi = max(a[i, 0], b[j, 0]), min(a[i, 1], b[j, 1])
+        if lo < hi:
+            out.append((lo, hi))
+        if a[i, 1] < b[j, 1]:
+            i += 1
+        else:
+            j += 1
+    return np.array(out, dtype=np.result_type(a, b)).reshape(-1, 2)
+
+
+def total_seconds(intervals):
+    """Summed length of an interval list, in seconds."""
+    intervals = np.asarray(intervals)
+    if not len(intervals):
+        return 0.0
+    length = intervals[:, 1] - intervals[:, 0]
+    if np.issubdtype(length.dtype, np.timedelta64):
+        return length.sum() / np.timedelta64(1, 's')
+    return float(length.sum()) * 86400
+
+
+def observable_windows(segments, site, night_code=2):
+    """
+    Observable windows for one site from propagate_adaptive() segments.
+
+    A window is a maximal run of time with the satellite above the airmass
+    limit and ``{site} TIME < night_code``.  Returns a DataFrame with
+    'Start (UTC)', 'End (UTC)', 'Duration (s)' and 'Eclipse (s)', the part
+    of the window the satellite spends in shadow.
+    """
+    mask = segments[f'{site} Above'].to_numpy() & (segments[f'{site} TIME'].to_numpy() < night_code)
+    eclipsed = np.where(mask & segments['In Shadow'].to_numpy(), segments['Duration (s)'].to_numpy(), 0.0)
+    first, stop = _runs(mask)
+    cumulative = np.concatenate([[0.0], np.cumsum(eclipsed)])
+
+    starts = segments['Start (UTC)'].to_numpy()[first]
+    ends = segments['End (UTC)'].to_numpy()[stop - 1]
+    return pd.DataFrame({
+        'Start (UTC)': starts,
+        'End (UTC)': ends,
+        'Duration (s)': (ends - starts) / np.timedelta64(1, 's'),
+        'Eclipse (s)': cumulative[stop] - cumulative[first],
+    })
+
+
+def night_seconds(segments, site, night_code=2):
+    """Total time with ``{site} TIME < night_code``, in seconds."""
+    night = segments[f'{site} TIME'].to_numpy() < night_code
+    return float(segments['Duration (s)'].to_numpy()[night].sum())
+
+
+def eclipse_nights(segments, site, night_code=2, timezone=None):
+    """
+    Distinct local calendar dates with an eclipse during an observable window.
+
+    Same definition as the dense scorers, which count the unique
+    ``Time (EST)`` dates of visible, in-shadow samples.
+    """
+    mask = (segments[f'{site} Above'].to_numpy()
+            & (segments[f'{site} TIME'].to_numpy() < night_code)
+            & segments['In Shadow'].to_numpy())
+    if not mask.any():
+        return 0
+    tz = timezone or parameters.timezone
+    starts = pd.DatetimeIndex(segments['Start (UTC)'].to_numpy()[mask]).tz_localize('UTC').tz_convert(tz)
+    ends = pd.DatetimeIndex(segments['End (UTC)'].to_numpy()[mask] - np.timedelta64(1, 'us')).tz_localize('UTC').tz_convert(tz)
+    return len(set(starts.date) | set(ends.date))
+
+
+def visibility_summary(segments, night_codes=None, sites=OPTIMIZER_SITES, timezone=None):
+    """
+    Per-site visibility metrics from interval arithmetic.
+
+    ``night_codes`` maps site name to the largest twilight code excluded
+    from "night" (default 2 for every site, as in the optimizer).  Returns
+    ``{site: {"visibility_percentage", "eclipse_nights", "visible_seconds",
+    "night_seconds", "windows"}}``.
+    """
+    night_codes = night_codes or {}
+    out = {}
+    for site in sites:
+        name = site["name"]
+        code = night_codes.get(name, 2)
+        windows = observable_windows(segments, name, code)
+        visible = float(windows['Duration (s)'].sum())
+        night = night_seconds(segments, name, code)
+        out[name] = {
+            "visibility_percentage": (visible / night * 100) if night else 0,
+            "eclipse_nights": eclipse_nights(segments, name, code, timezone),
+            "visible_seconds": visible,
+            "night_seconds": night,
+            "windows": windows,
+        }
+    return out
+
+
+def orbit_visibility(inc, eccen, nodeo, airmass=2.0, night_codes=None, sites=OPTIMIZER_SITES, **kwargs):
+    """
+    Event-based replacement for masking a dense func() table.
+
+    Finds the altitude, twilight and eclipse transitions for one orbit with
+    propagate_adaptive() (extra keyword arguments are passed through) and
+    returns visibility_summary() of the resulting segments.
+    """
+    events, segments = propagate_adaptive(inc, eccen, nodeo, airmass=airmass, sites=sites, **kwargs)
+    return visibility_summary(segments, night_codes, sites)
@@ -9,13 +9,10 @@ from astropy.io import fits
 from astropy.convolution import Gaussian2DKernel
 from astropy.convolution import convolve, convolve_fft
 from astropy.coordinates import SkyCoord
-data = np.genfromtxt('satcoord.csv',delimiter=',',skip_header=1) # inputs data file from orbit and flux simulations
-with fits.open("model-bias-image.fit") as hdul:  # opens mobdel bias image
-    bias_data = hdul[0].data  # assume the first extension is an image
-    
-ra_sat = data[:,1] # simulated right ascention data from landolt
-dec_sat = data[:,2] # simulated declination data from landolt
-sat_counts = data[:,8] # reading in simulated counts from landolt
+import sys
+# The propagation products reader lives next to the canonical pipeline
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Orbit Propagation (Aiden-Dawn)"))
+from products import open_products
 diam_t = 0.8128 # diameter of telescope
 t_eff = 0.5 # telescope efficiency
 ccd_eff = 0.8 # ccd quantum efficiency
@@ -128,193 +125,216 @@ def sky_background(image, sky_counts, gain=1):
     
     return sky_im
 
-center = SkyCoord(ra=ra_sat[0], dec=dec_sat[0], frame='icrs', unit='deg') # formats coordinates of landolt
-c = coordinates.SkyCoord(center, frame='icrs') # formatted coordinates
-r = (fov + 5)*u.arcminute # setting field of view
-Simbad.add_votable_fields("otypes", "V", "R", "I", "J", "H") # want vmag and type of object from simbad
-result_table = Simbad.query_region(c, radius=r, criteria = "otypes.otype = 'Star'") # finds stars within the field of view of the telescope around landolt
+def simulate_image(sat, bias_data, lmbda_n=lmbda_n, exp_time=exp_time, tracking_mode=tracking_mode):
+    """
+    Simulated CCD frame of one exposure: field stars from Simbad around the
+    satellite plus its streak, convolved with the PSF and with read noise,
+    ``bias_data``, dark current and sky background added.
 
-# makes sure magnitudes are taken of the correct filter
-if lmbda_n == 0:
-    flux = result_table.columns['V'] # records vmag
-elif lmbda_n == 1:
-    flux = result_table.columns['R'] # records vmag
-elif lmbda_n == 2:
-    flux = result_table.columns['I'] # records vmag
-elif lmbda_n == 3:
-    flux = result_table.columns['J'] # records vmag
-elif lmbda_n == 4:
-    flux = result_table.columns['J'] # records vmag
-elif lmbda_n == 5:
-    flux = result_table.columns['H'] # records vmag
-    
-# retrieves vmag of all stars that have vmag measurements and excludes those that don't
-index = []
-for i in range(len(flux)):
-    if flux[i] > 0:
-        index.append(i)
-    else:
-        pass
-    
-ra = result_table.columns['ra'][index] # pulling ra data of stars around landolt
-if tracking_mode == 1:
-    ra = ra[np.where(ra > ra_sat[0])] # setting landolt to appear to the far left side of the image
-    ra = ra[np.where(abs(ra_sat[0] - ra) < fov/60)]
-    ra_range = np.linspace(ra_sat[0],ra_sat[0] + fov/60,num=ccd_size) # assigns each pixel an ra value
-else:
-    ra = ra[np.where(abs(ra - ra_sat[0]) < fov/120)]
-    ra_range = np.linspace(min(ra),max(ra),num=ccd_size) # assigns each pixel an ra value
-dec = result_table.columns['dec'][index] # same for declination
-dec = dec[np.where(abs(dec - dec_sat[0]) < fov/120)]
+    ``sat`` holds the orbit and flux products (``ra``, ``dec`` and the
+    ``counts`` column) for at least ``exp_time`` samples.
+    """
+    ra_sat = np.array(sat.ra, dtype=np.float64) # simulated right ascention data from landolt (a copy, the tracking modes shift it)
+    dec_sat = np.array(sat.dec, dtype=np.float64) # simulated declination data from landolt
+    sat_counts = sat.columns['counts'] # reading in simulated counts from landolt (flux_counts.py)
+
+    center = SkyCoord(ra=ra_sat[0], dec=dec_sat[0], frame='icrs', unit='deg') # formats coordinates of landolt
+    c = coordinates.SkyCoord(center, frame='icrs') # formatted coordinates
+    r = (fov + 5)*u.arcminute # setting field of view
+    Simbad.add_votable_fields("otypes", "V", "R", "I", "J", "H") # want vmag and type of object from simbad
+    result_table = Simbad.query_region(c, radius=r, criteria = "otypes.otype = 'Star'") # finds stars within the field of view of the telescope around landolt
+
+    # makes sure magnitudes are taken of the correct filter
+    if lmbda_n == 0:
+        flux = result_table.columns['V'] # records vmag
+    elif lmbda_n == 1:
+        flux = result_table.columns['R'] # records vmag
+    elif lmbda_n == 2:
+        flux = result_table.columns['I'] # records vmag
+    elif lmbda_n == 3:
+        flux = result_table.columns['J'] # records vmag
+    elif lmbda_n == 4:
+        flux = result_table.columns['J'] # records vmag
+    elif lmbda_n == 5:
+        flux = result_table.columns['H'] # records vmag
+
+    # retrieves vmag of all stars that have vmag measurements and excludes those that don't
+    index = []
+    for i in range(len(flux)):
+        if flux[i] > 0:
+            index.append(i)
+        else:
+            pass
 
-flux = flux[index] # retrieves vmags of all stars
-flux = exp_time*(10**(flux/(-2.5)))*(zp[lmbda_n]*1e-7*10000*a_t*1e10*bandpass[lmbda_n]*1e-11) # converts magnitude to flux
-counts = (flux*lmbda[lmbda_n])/(6.62607015e-34*299792458) # converts flux to counts
-# factor influencing sky noise comes from https://cires.colorado.edu/Artificial-light (multiply ratio at bottom of page to normal sky brightness)
-sky_counts = exp_time*(sccoeff[lmbda_n]*(np.pi*(diam_t/2)**2)*bandpass[lmbda_n]*1e6*(app**2))*t_eff # https://www.eso.org/observing/etc/bin/gen/form?INS.MODE=swspectr+INS.NAME=SKYCALC - counts from sky background
+    ra = result_table.columns['ra'][index] # pulling ra data of stars around landolt
+    if tracking_mode == 1:
+        ra = ra[np.where(ra > ra_sat[0])] # setting landolt to appear to the far left side of the image
+        ra = ra[np.where(abs(ra_sat[0] - ra) < fov/60)]
+        ra_range = np.linspace(ra_sat[0],ra_sat[0] + fov/60,num=ccd_size) # assigns each pixel an ra value
+    else:
+        ra = ra[np.where(abs(ra - ra_sat[0]) < fov/120)]
+        ra_range = np.linspace(min(ra),max(ra),num=ccd_size) # assigns each pixel an ra value
+    dec = result_table.columns['dec'][index] # same for declination
+    dec = dec[np.where(abs(dec - dec_sat[0]) < fov/120)]
 
-ra_step = abs(ra_range[1]-ra_range[0]) # the difference in ra between two pixels
-dec_range = np.linspace(min(dec),max(dec),num=ccd_size) # assigns each pixel a dec value
-dec_step = abs(dec_range[1]-dec_range[0]) # the difference in dec between two pixels
+    flux = flux[index] # retrieves vmags of all stars
+    flux = exp_time*(10**(flux/(-2.5)))*(zp[lmbda_n]*1e-7*10000*a_t*1e10*bandpass[lmbda_n]*1e-11) # converts magnitude to flux
+    counts = (flux*lmbda[lmbda_n])/(6.62607015e-34*299792458) # converts flux to counts
+    # factor influencing sky noise comes from https://cires.colorado.edu/Artificial-light (multiply ratio at bottom of page to normal sky brightness)
+    sky_counts = exp_time*(sccoeff[lmbda_n]*(np.pi*(diam_t/2)**2)*bandpass[lmbda_n]*1e6*(app**2))*t_eff # https://www.eso.org/observing/etc/bin/gen/form?INS.MODE=swspectr+INS.NAME=SKYCALC - counts from sky background
 
-synthetic_image = np.zeros([ccd_size,ccd_size]) # creates simulated image base
-gaussian_2D_kernel = Gaussian2DKernel(6) # creates PSF
-plt.imshow(gaussian_2D_kernel, interpolation='none', origin='lower') # shows PSF
+    ra_step = abs(ra_range[1]-ra_range[0]) # the difference in ra between two pixels
+    dec_range = np.linspace(min(dec),max(dec),num=ccd_size) # assigns each pixel a dec value
+    dec_step = abs(dec_range[1]-dec_range[0]) # the difference in dec between two pixels
 
-# for sidereal rate
-if tracking_mode == 1: 
+    synthetic_image = np.zeros([ccd_size,ccd_size]) # creates simulated image base
+    gaussian_2D_kernel = Gaussian2DKernel(6) # creates PSF
+    plt.imshow(gaussian_2D_kernel, interpolation='none', origin='lower') # shows PSF
 
-    # adds stars around landolt to simulated image base
-    for i in range(len(ra)):
-        close = np.where(abs(ra[i] - ra_range) <= ra_step)
-        close2 = np.where(abs(dec[i] - dec_range) <= dec_step)
-        rweight_1, rweight_2 = (abs(ra[i] - ra_range[close]) / ra_step) / 4
-        dweight_1, dweight_2 = (abs(dec[i] - dec_range[close2]) / dec_step) / 4
-        weight00 = rweight_1 + dweight_1
-        weight10 = rweight_1 + dweight_2
-        weight11 = rweight_2 + dweight_2
-        weight01 = rweight_2 + dweight_1
-        synthetic_image[close2[0][0],close[0][0]] = synthetic_image[close2[0][0],close[0][0]] + weight00*counts[i]*t_eff*ccd_eff
-        synthetic_image[close2[0][0],close[0][1]] = synthetic_image[close2[0][0],close[0][1]] + weight01*counts[i]*t_eff*ccd_eff
-        synthetic_image[close2[0][1],close[0][1]] = synthetic_image[close2[0][1],close[0][1]] + weight11*counts[i]*t_eff*ccd_eff
-        synthetic_image[close2[0][1],close[0][0]] = synthetic_image[close2[0][1],close[0][0]] + weight10*counts[i]*t_eff*ccd_eff
+    # for sidereal rate
+    if tracking_mode == 1: 
 
-    # adds landolt to simulated image base
-    for i in range(exp_time-1):
-        streakra = np.linspace(ra_sat[i], ra_sat[i+1], num = 50)
-        streakdec = np.linspace(dec_sat[i], dec_sat[i+1], num = 50)
-        for j in range(len(streakra)):
-            close = np.where(abs(streakra[j] - ra_range) <= ra_step)
-            close2 = np.where(abs(streakdec[j] - dec_range) <= dec_step)
-            rweight_1, rweight_2 = (abs(streakra[j] - ra_range[close]) / ra_step) / (50*4)
-            dweight_1, dweight_2 = (abs(streakdec[j] - dec_range[close2]) / dec_step) / (50*4)
+        # adds stars around landolt to simulated image base
+        for i in range(len(ra)):
+            close = np.where(abs(ra[i] - ra_range) <= ra_step)
+            close2 = np.where(abs(dec[i] - dec_range) <= dec_step)
+            rweight_1, rweight_2 = (abs(ra[i] - ra_range[close]) / ra_step) / 4
+            dweight_1, dweight_2 = (abs(dec[i] - dec_range[close2]) / dec_step) / 4
             weight00 = rweight_1 + dweight_1
             weight10 = rweight_1 + dweight_2
             weight11 = rweight_2 + dweight_2
             weight01 = rweight_2 + dweight_1
-            synthetic_image[close2[0][0],close[0][0]] = synthetic_image[close2[0][0],close[0][0]] + weight00*sat_counts[i]*t_eff*ccd_eff
-            synthetic_image[close2[0][0],close[0][1]] = synthetic_image[close2[0][0],close[0][1]] + weight01*sat_counts[i]*t_eff*ccd_eff
-            synthetic_image[close2[0][1],close[0][1]] = synthetic_image[close2[0][1],close[0][1]] + weight11*sat_counts[i]*t_eff*ccd_eff
-            synthetic_image[close2[0][1],close[0][0]] = synthetic_image[close2[0][1],close[0][0]] + weight10*sat_counts[i]*t_eff*ccd_eff
+            synthetic_image[close2[0][0],close[0][0]] = synthetic_image[close2[0][0],close[0][0]] + weight00*counts[i]*t_eff*ccd_eff
+            synthetic_image[close2[0][0],close[0][1]] = synthetic_image[close2[0][0],close[0][1]] + weight01*counts[i]*t_eff*ccd_eff
+            synthetic_image[close2[0][1],close[0][1]] = synthetic_image[close2[0][1],close[0][1]] + weight11*counts[i]*t_eff*ccd_eff
+            synthetic_image[close2[0][1],close[0][0]] = synthetic_image[close2[0][1],close[0][0]] + weight10*counts[i]*t_eff*ccd_eff
 
-# for stationary telescope
-if tracking_mode == 2:
-    
-    # adds stars around landolt to simulated image base
-    for s in range(len(ra)):  
-        for i in range(exp_time):
-            streakra = np.linspace(ra[s], ra[s] + 0.00417807462379, num = 50)
+        # adds landolt to simulated image base
+        for i in range(exp_time-1):
+            streakra = np.linspace(ra_sat[i], ra_sat[i+1], num = 50)
+            streakdec = np.linspace(dec_sat[i], dec_sat[i+1], num = 50)
             for j in range(len(streakra)):
                 close = np.where(abs(streakra[j] - ra_range) <= ra_step)
-                if np.size(close) == 1:
-                    break
-                elif np.size(close) == 0:
-                    break
-                else:
-                    close2 = np.where(abs(dec[s] - dec_range) <= dec_step)
-                    rweight_1, rweight_2 = (abs(streakra[j] - ra_range[close]) / ra_step) / (50*4)
-                    dweight_1, dweight_2 = (abs(dec[s] - dec_range[close2]) / dec_step) / (50*4)
-                    weight00 = rweight_1 + dweight_1
-                    weight10 = rweight_1 + dweight_2
-                    weight11 = rweight_2 + dweight_2
-                    weight01 = rweight_2 + dweight_1
-                    synthetic_image[close2[0][0],close[0][0]] = synthetic_image[close2[0][0],close[0][0]] + weight00*counts[s]*t_eff*ccd_eff
-                    synthetic_image[close2[0][0],close[0][1]] = synthetic_image[close2[0][0],close[0][1]] + weight01*counts[s]*t_eff*ccd_eff
-                    synthetic_image[close2[0][1],close[0][1]] = synthetic_image[close2[0][1],close[0][1]] + weight11*counts[s]*t_eff*ccd_eff
-                    synthetic_image[close2[0][1],close[0][0]] = synthetic_image[close2[0][1],close[0][0]] + weight10*counts[s]*t_eff*ccd_eff
-            ra[s] = ra[s] + 0.00417807462379
-    
-    # adds landolt to simulated image base
-    for i in range(exp_time-1):
-        ra_sat[i+1] = ra_sat[i+1] - 0.00417807462379*(1+i)
-        streakra = np.linspace(ra_sat[i], ra_sat[i+1], num = 50)
-        streakdec = np.linspace(dec_sat[i], dec_sat[i+1], num = 50)
-        for j in range(len(streakra)):
-            close = np.where(abs(streakra[j] - ra_range) <= ra_step)
-            close2 = np.where(abs(streakdec[j] - dec_range) <= dec_step)
-            rweight_1, rweight_2 = (abs(streakra[j] - ra_range[close]) / ra_step) / (50*4)
-            dweight_1, dweight_2 = (abs(streakdec[j] - dec_range[close2]) / dec_step) / (50*4)
-            weight00 = rweight_1 + dweight_1
-            weight10 = rweight_1 + dweight_2
-            weight11 = rweight_2 + dweight_2
-            weight01 = rweight_2 + dweight_1
-            synthetic_image[close2[0][0],close[0][0]] = synthetic_image[close2[0][0],close[0][0]] + weight00*sat_counts[i]*t_eff*ccd_eff
-            synthetic_image[close2[0][0],close[0][1]] = synthetic_image[close2[0][0],close[0][1]] + weight01*sat_counts[i]*t_eff*ccd_eff
-            synthetic_image[close2[0][1],close[0][1]] = synthetic_image[close2[0][1],close[0][1]] + weight11*sat_counts[i]*t_eff*ccd_eff
-            synthetic_image[close2[0][1],close[0][0]] = synthetic_image[close2[0][1],close[0][0]] + weight10*sat_counts[i]*t_eff*ccd_eff
+                close2 = np.where(abs(streakdec[j] - dec_range) <= dec_step)
+                rweight_1, rweight_2 = (abs(streakra[j] - ra_range[close]) / ra_step) / (50*4)
+                dweight_1, dweight_2 = (abs(streakdec[j] - dec_range[close2]) / dec_step) / (50*4)
+                weight00 = rweight_1 + dweight_1
+                weight10 = rweight_1 + dweight_2
+                weight11 = rweight_2 + dweight_2
+                weight01 = rweight_2 + dweight_1
+                synthetic_image[close2[0][0],close[0][0]] = synthetic_image[close2[0][0],close[0][0]] + weight00*sat_counts[i]*t_eff*ccd_eff
+                synthetic_image[close2[0][0],close[0][1]] = synthetic_image[close2[0][0],close[0][1]] + weight01*sat_counts[i]*t_eff*ccd_eff
+                synthetic_image[close2[0][1],close[0][1]] = synthetic_image[close2[0][1],close[0][1]] + weight11*sat_counts[i]*t_eff*ccd_eff
+                synthetic_image[close2[0][1],close[0][0]] = synthetic_image[close2[0][1],close[0][0]] + weight10*sat_counts[i]*t_eff*ccd_eff
 
-# for half sidereal rate
-if tracking_mode == 3:
-    
-    # adds stars around landolt to simulated image base
-    for s in range(len(ra)):  
-        for i in range(exp_time):
-            streakra = np.linspace(ra[s], ra[s] + 0.0020890373119, num = 50)
+    # for stationary telescope
+    if tracking_mode == 2:
+
+        # adds stars around landolt to simulated image base
+        for s in range(len(ra)):  
+            for i in range(exp_time):
+                streakra = np.linspace(ra[s], ra[s] + 0.00417807462379, num = 50)
+                for j in range(len(streakra)):
+                    close = np.where(abs(streakra[j] - ra_range) <= ra_step)
+                    if np.size(close) == 1:
+                        break
+                    elif np.size(close) == 0:
+                        break
+                    else:
+                        close2 = np.where(abs(dec[s] - dec_range) <= dec_step)
+                        rweight_1, rweight_2 = (abs(streakra[j] - ra_range[close]) / ra_step) / (50*4)
+                        dweight_1, dweight_2 = (abs(dec[s] - dec_range[close2]) / dec_step) / (50*4)
+                        weight00 = rweight_1 + dweight_1
+                        weight10 = rweight_1 + dweight_2
+                        weight11 = rweight_2 + dweight_2
+                        weight01 = rweight_2 + dweight_1
+                        synthetic_image[close2[0][0],close[0][0]] = synthetic_image[close2[0][0],close[0][0]] + weight00*counts[s]*t_eff*ccd_eff
+                        synthetic_image[close2[0][0],close[0][1]] = synthetic_image[close2[0][0],close[0][1]] + weight01*counts[s]*t_eff*ccd_eff
+                        synthetic_image[close2[0][1],close[0][1]] = synthetic_image[close2[0][1],close[0][1]] + weight11*counts[s]*t_eff*ccd_eff
+                        synthetic_image[close2[0][1],close[0][0]] = synthetic_image[close2[0][1],close[0][0]] + weight10*counts[s]*t_eff*ccd_eff
+                ra[s] = ra[s] + 0.00417807462379
+
+        # adds landolt to simulated image base
+        for i in range(exp_time-1):
+            ra_sat[i+1] = ra_sat[i+1] - 0.00417807462379*(1+i)
+            streakra = np.linspace(ra_sat[i], ra_sat[i+1], num = 50)
+            streakdec = np.linspace(dec_sat[i], dec_sat[i+1], num = 50)
             for j in range(len(streakra)):
                 close = np.where(abs(streakra[j] - ra_range) <= ra_step)
-                if np.size(close) == 1:
-                    break
-                elif np.size(close) == 0:
-                    break
-                else:
-                    close2 = np.where(abs(dec[s] - dec_range) <= dec_step)
-                    rweight_1, rweight_2 = (abs(streakra[j] - ra_range[close]) / ra_step) / (50*4)
-                    dweight_1, dweight_2 = (abs(dec[s] - dec_range[close2]) / dec_step) / (50*4)
-                    weight00 = rweight_1 + dweight_1
-                    weight10 = rweight_1 + dweight_2
-                    weight11 = rweight_2 + dweight_2
-                    weight01 = rweight_2 + dweight_1
-                    synthetic_image[close2[0][0],close[0][0]] = synthetic_image[close2[0][0],close[0][0]] + weight00*counts[s]*t_eff*ccd_eff
-                    synthetic_image[close2[0][0],close[0][1]] = synthetic_image[close2[0][0],close[0][1]] + weight01*counts[s]*t_eff*ccd_eff
-                    synthetic_image[close2[0][1],close[0][1]] = synthetic_image[close2[0][1],close[0][1]] + weight11*counts[s]*t_eff*ccd_eff
-                    synthetic_image[close2[0][1],close[0][0]] = synthetic_image[close2[0][1],close[0][0]] + weight10*counts[s]*t_eff*ccd_eff
-            ra[s] = ra[s] + 0.0020890373119
-    
-    # adds landolt to simulated image base
-    for i in range(exp_time-1):
-        ra_sat[i+1] = ra_sat[i+1] - 0.0020890373119*(1+i)
-        streakra = np.linspace(ra_sat[i], ra_sat[i+1], num = 50)
-        streakdec = np.linspace(dec_sat[i], dec_sat[i+1], num = 50)
-        for j in range(len(streakra)):
-            close = np.where(abs(streakra[j] - ra_range) <= ra_step)
-            close2 = np.where(abs(streakdec[j] - dec_range) <= dec_step)
-            rweight_1, rweight_2 = (abs(streakra[j] - ra_range[close]) / ra_step) / (50*4)
-            dweight_1, dweight_2 = (abs(streakdec[j] - dec_range[close2]) / dec_step) / (50*4)
-            weight00 = rweight_1 + dweight_1
-            weight10 = rweight_1 + dweight_2
-            weight11 = rweight_2 + dweight_2
-            weight01 = rweight_2 + dweight_1
-            synthetic_image[close2[0][0],close[0][0]] = synthetic_image[close2[0][0],close[0][0]] + weight00*sat_counts[i]*t_eff*ccd_eff
-            synthetic_image[close2[0][0],close[0][1]] = synthetic_image[close2[0][0],close[0][1]] + weight01*sat_counts[i]*t_eff*ccd_eff
-            synthetic_image[close2[0][1],close[0][1]] = synthetic_image[close2[0][1],close[0][1]] + weight11*sat_counts[i]*t_eff*ccd_eff
-            synthetic_image[close2[0][1],close[0][0]] = synthetic_image[close2[0][1],close[0][0]] + weight10*sat_counts[i]*t_eff*ccd_eff
+                close2 = np.where(abs(streakdec[j] - dec_range) <= dec_step)
+                rweight_1, rweight_2 = (abs(streakra[j] - ra_range[close]) / ra_step) / (50*4)
+                dweight_1, dweight_2 = (abs(streakdec[j] - dec_range[close2]) / dec_step) / (50*4)
+                weight00 = rweight_1 + dweight_1
+                weight10 = rweight_1 + dweight_2
+                weight11 = rweight_2 + dweight_2
+                weight01 = rweight_2 + dweight_1
+                synthetic_image[close2[0][0],close[0][0]] = synthetic_image[close2[0][0],close[0][0]] + weight00*sat_counts[i]*t_eff*ccd_eff
+                synthetic_image[close2[0][0],close[0][1]] = synthetic_image[close2[0][0],close[0][1]] + weight01*sat_counts[i]*t_eff*ccd_eff
+                synthetic_image[close2[0][1],close[0][1]] = synthetic_image[close2[0][1],close[0][1]] + weight11*sat_counts[i]*t_eff*ccd_eff
+                synthetic_image[close2[0][1],close[0][0]] = synthetic_image[close2[0][1],close[0][0]] + weight10*sat_counts[i]*t_eff*ccd_eff
 
-synthetic_image = convolve(synthetic_image, gaussian_2D_kernel) # convolves stars with PSF
-synthetic_image = synthetic_image + read_noise(synthetic_image, 5) + bias_data + dark_current(synthetic_image, 0.1, exp_time) + sky_background(synthetic_image, (sky_counts)*ccd_eff) # adds noise
-    
-show_image(synthetic_image, cmap='gray', percl=99) # displays image       
+    # for half sidereal rate
+    if tracking_mode == 3:
+
+        # adds stars around landolt to simulated image base
+        for s in range(len(ra)):  
+            for i in range(exp_time):
+                streakra = np.linspace(ra[s], ra[s] + 0.0020890373119, num = 50)
+                for j in range(len(streakra)):
+                    close = np.where(abs(streakra[j] - ra_range) <= ra_step)
+                    if np.size(close) == 1:
+                        break
+                    elif np.size(close) == 0:
+                        break
+                    else:
+                        close2 = np.where(abs(dec[s] - dec_range) <= dec_step)
+                        rweight_1, rweight_2 = (abs(streakra[j] - ra_range[close]) / ra_step) / (50*4)
+                        dweight_1, dweight_2 = (abs(dec[s] - dec_range[close2]) / dec_step) / (50*4)
+                        weight00 = rweight_1 + dweight_1
+                        weight10 = rweight_1 + dweight_2
+                        weight11 = rweight_2 + dweight_2
+                        weight01 = rweight_2 + dweight_1
+                        synthetic_image[close2[0][0],close[0][0]] = synthetic_image[close2[0][0],close[0][0]] + weight00*counts[s]*t_eff*ccd_eff
+                        synthetic_image[close2[0][0],close[0][1]] = synthetic_image[close2[0][0],close[0][1]] + weight01*counts[s]*t_eff*ccd_eff
+                        synthetic_image[close2[0][1],close[0][1]] = synthetic_image[close2[0][1],close[0][1]] + weight11*counts[s]*t_eff*ccd_eff
+                        synthetic_image[close2[0][1],close[0][0]] = synthetic_image[close2[0][1],close[0][0]] + weight10*counts[s]*t_eff*ccd_eff
+                ra[s] = ra[s] + 0.0020890373119
+
+        # adds landolt to simulated image base
+        for i in range(exp_time-1):
+            ra_sat[i+1] = ra_sat[i+1] - 0.0020890373119*(1+i)
+            streakra = np.linspace(ra_sat[i], ra_sat[i+1], num = 50)
+            streakdec = np.linspace(dec_sat[i], dec_sat[i+1], num = 50)
+            for j in range(len(streakra)):
+                close = np.where(abs(streakra[j] - ra_range) <= ra_step)
+                close2 = np.where(abs(streakdec[j] - dec_range) <= dec_step)
+                rweight_1, rweight_2 = (abs(streakra[j] - ra_range[close]) / ra_step) / (50*4)
+                dweight_1, dweight_2 = (abs(streakdec[j] - dec_range[close2]) / dec_step) / (50*4)
+                weight00 = rweight_1 + dweight_1
+                weight10 = rweight_1 + dweight_2
+                weight11 = rweight_2 + dweight_2
+                weight01 = rweight_2 + dweight_1
+                synthetic_image[close2[0][0],close[0][0]] = synthetic_image[close2[0][0],close[0][0]] + weight00*sat_counts[i]*t_eff*ccd_eff
+                synthetic_image[close2[0][0],close[0][1]] = synthetic_image[close2[0][0],close[0][1]] + weight01*sat_counts[i]*t_eff*ccd_eff
+                synthetic_image[close2[0][1],close[0][1]] = synthetic_image[close2[0][1],close[0][1]] + weight11*sat_counts[i]*t_eff*ccd_eff
+                synthetic_image[close2[0][1],close[0][0]] = synthetic_image[close2[0][1],close[0][0]] + weight10*sat_counts[i]*t_eff*ccd_eff
+
+    synthetic_image = convolve(synthetic_image, gaussian_2D_kernel) # convolves stars with PSF
+    synthetic_image = synthetic_image + read_noise(synthetic_image, 5) + bias_data + dark_current(synthetic_image, 0.1, exp_time) + sky_background(synthetic_image, (sky_counts)*ccd_eff) # adds noise
+
+    return synthetic_image
+
+
+if __name__ == "__main__":
+    with fits.open("model-bias-image.fit") as hdul:  # opens mobdel bias image
+        bias_data = hdul[0].data  # assume the first extension is an image
+
+    sat = open_products(rows=slice(0, exp_time)) # memory-maps the orbit and flux products, only the samples in one exposure
+    synthetic_image = simulate_image(sat, bias_data)
+
+    show_image(synthetic_image, cmap='gray', percl=99) # displays image       
 
-# outputs data
-hdu = fits.PrimaryHDU(data=synthetic_image)
-hdul = fits.HDUList([hdu])
-hdul.writeto('mode1extracounts.fits', overwrite=True)
\ No newline at end of file
+    # outputs data
+    hdu = fits.PrimaryHDU(data=synthetic_image)
+    hdul = fits.HDUList([hdu])
+    hdul.writeto('mode1extracounts.fits', overwrite=True)
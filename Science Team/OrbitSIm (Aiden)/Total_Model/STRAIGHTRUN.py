@@ -14,6 +14,11 @@ from geopandas import GeoDataFrame
 import geodatasets
 import matplotlib.pyplot as plt
 
+# Loaded once per process and shared by every func() call
+ts = load.timescale()
+eph = load('de421.bsp')
+
+
 def eclipse(satpos, earthpos, sunpos):
 
     satpos = Barycentric(satpos + earthpos).position.au
@@ -76,11 +81,8 @@ def eclipse(satpos, earthpos, sunpos):
 
 
 def func (inc, eccen, node):
-    # Load timescale
-    ts = load.timescale()
     tscale = int((parameters.end - parameters.start) * 24 * 60 * 60 * 1000 + 1)
 
-    eph = load('de421.bsp')
     sun, earth = eph['sun'], eph['earth']
 
 
@@ -11,6 +11,10 @@ from skyfield import almanac
 
 
 
+# Loaded once per process and shared by every func() call
+ts = load.timescale()
+eph = load('de421.bsp')
+
 
 #calculates eclipse % data for each time step in a chunck
 def eclipse(satpos, earthpos, sunpos):
@@ -76,11 +80,8 @@ def eclipse(satpos, earthpos, sunpos):
 
 
 def func (inc, eccen, node):
-    # Load timescale
-    ts = load.timescale()
     tscale = int((parameters.end - parameters.start) * 24 * 60 * 60 * 1000 + 1)
 
-    eph = load('de421.bsp')
     sun, earth = eph['sun'], eph['earth']
 
 
@@ -8,6 +8,11 @@ from pytz import timezone
 from settings import parameters
 import math
 
+# Loaded once per process and shared by every func() call
+ts = load.timescale()
+eph = load('de421.bsp')
+
+
 def eclipse(satpos, earthpos, sunpos):
 
     satpos = Barycentric(satpos + earthpos).position.au
@@ -75,11 +80,8 @@ def func (kaizo):
 
     start_time = time.time()
     print("Simulating Satellite Orbit...")
-    # Load timescale
-    ts = load.timescale()
     tscale = int((parameters.end - parameters.start) * 24 * 60 * 60 * 1000 + 1)
 
-    eph = load('de421.bsp')
     sun, earth = eph['sun'], eph['earth']
 
 